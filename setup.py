@@ -14,7 +14,10 @@ import dotenv
 from pymongo import MongoClient
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure, CollectionInvalid
 
+from viva_vdm.core.prosite.shards import PrositeDatabaseShards
+from viva_vdm.core.prosite.store import PrositeRecordStore
 from viva_vdm.core.settings import ResourceConfig
+from viva_vdm.core.taxonomy.index import TaxonomyIndex, download_names
 
 
 class Setup(object):
@@ -34,6 +37,7 @@ class Setup(object):
         self._create_db()
         self._create_user()
         self._download_prosite()
+        self._download_taxonomy()
 
     def _check_if_connected(self):
         try:
@@ -96,6 +100,9 @@ class Setup(object):
         print("Downloading Prosite database..")
         urllib.request.urlretrieve('https://ftp.expasy.org/databases/prosite/prosite.dat', prosite_db)
 
+        print("Building Prosite record store..")
+        PrositeRecordStore(prosite_db).build()
+
         print("Downloading Prosite binaries..")
         if platform.system() == "Linux":
             prosite_archive = os.path.join(prosite_dir, 'ps_scan_linux_x86_elf.tar.gz')
@@ -125,8 +132,26 @@ class Setup(object):
             self._extract_tar(prosite_archive, prosite_dir)
             dotenv.set_key(dotenv_file, "PROSITE_INSTALL_PATH", os.path.join(prosite_dir, 'ps_scan', 'pfscan'))
 
+        print("Splitting Prosite database into shards..")
+        PrositeDatabaseShards(prosite_db).get_paths()
+
         print("Prosite setup completed.")
 
+    def _download_taxonomy(self):
+        print("Creating taxonomy directory..")
+        taxonomy_dir = self._create_dir('taxonomy')
+
+        print("Downloading NCBI taxonomy names..")
+        names_path = download_names(taxonomy_dir)
+
+        dotenv_file = dotenv.find_dotenv()
+        dotenv.set_key(dotenv_file, "TAXONOMY_NAMES_PATH", names_path)
+
+        print("Building taxonomy index..")
+        TaxonomyIndex(names_path).build()
+
+        print("Taxonomy setup completed.")
+
     @classmethod
     def _extract_tar(cls, tar_path: str, extract_path: str):
         tar = tarfile.open(tar_path, "r:gz")
@@ -135,15 +160,19 @@ class Setup(object):
 
     @classmethod
     def _create_prosite_dir(cls) -> str:
+        return cls._create_dir('prosite')
+
+    @classmethod
+    def _create_dir(cls, name: str) -> str:
         cwd = os.getcwd()
-        prosite_dir = os.path.join(cwd, 'prosite')
+        directory = os.path.join(cwd, name)
 
-        if os.path.exists(prosite_dir):
-            shutil.rmtree(prosite_dir)
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
 
-        os.mkdir(prosite_dir)
+        os.mkdir(directory)
 
-        return prosite_dir
+        return directory
 
 
 def main():
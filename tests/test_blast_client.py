@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from viva_vdm.core.blast.client import AsyncBlastClient
+from viva_vdm.core.blast.exceptions import BlastException
+
+
+@pytest.fixture
+def client(monkeypatch) -> AsyncBlastClient:
+    monkeypatch.setenv('PROSITE_INSTALL_PATH', 'pfscan')
+    monkeypatch.setenv('PROSITE_DB_PATH', 'prosite.dat')
+
+    return AsyncBlastClient(database='VNR', poll_interval=2.0, max_poll_interval=30.0, timeout=0.05)
+
+
+class _StatusResponse(object):
+    def __init__(self, status: int):
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+    async def text(self) -> str:
+        return str(self.status)
+
+
+class _StatusSession(object):
+    def __init__(self, statuses):
+        self.statuses = iter(statuses)
+        self.polls = 0
+
+    def get(self, _):
+        self.polls += 1
+
+        return _StatusResponse(next(self.statuses))
+
+
+def test_poll_delay_backs_off_with_jitter(client):
+    for attempt, delay in enumerate([2.0, 4.0, 8.0, 16.0, 30.0, 30.0]):
+        assert delay / 2 <= client._get_poll_delay(attempt) <= delay
+
+
+def test_poll_delay_does_not_overflow(client):
+    assert 15.0 <= client._get_poll_delay(5000) <= 30.0
+
+
+def test_wait_for_completion_returns_once_the_job_completes(client):
+    client.poll_interval = 0.001
+    client._session = _StatusSession([1, 1, 3])
+
+    asyncio.run(client._wait_for_completion('job'))
+
+    assert client._session.polls == 3
+
+
+def test_wait_for_completion_raises_for_failed_jobs(client):
+    client._session = _StatusSession([2])
+
+    with pytest.raises(BlastException):
+        asyncio.run(client._wait_for_completion('job'))
+
+
+def test_wait_for_completion_gives_up_after_the_timeout(client):
+    client._session = _StatusSession(iter(lambda: 1, None))
+
+    with pytest.raises(BlastException, match='not completed'):
+        asyncio.run(client._wait_for_completion('job'))
+
+    # The job is polled right away, and one last time at the deadline.
+    assert client._session.polls == 2
@@ -0,0 +1,82 @@
+import asyncio
+import io
+import json
+
+import ijson
+
+from viva_vdm.core.blast.parsers import _DescriptionCollector, aiter_query_descriptions, iter_query_descriptions
+
+
+def _get_report(query_title: str, descriptions: list) -> dict:
+    return {
+        'report': {
+            'results': {
+                'search': {
+                    'query_title': query_title,
+                    'hits': [
+                        {
+                            'num': index,
+                            'description': [description],
+                            # The alignments are skipped by the parser.
+                            'hsps': [{'qseq': 'MDSNTVSSFQDI', 'hseq': 'MDSNTVSSFQDI', 'midline': 'MDSNTVSSFQDI'}],
+                        }
+                        for index, description in enumerate(descriptions, start=1)
+                    ],
+                }
+            }
+        }
+    }
+
+
+RESULTS = {
+    'BlastOutput2': [
+        _get_report(
+            'hcs0',
+            [
+                {'id': 'gi|1', 'accession': 'P03433', 'title': 'Polymerase', 'taxid': 11320, 'sciname': 'Influenza A'},
+                {'id': 'gi|2', 'accession': 'P03431', 'title': 'Polymerase basic protein 2'},
+            ],
+        ),
+        _get_report('hcs1', []),
+    ]
+}
+
+
+def _get_events():
+    return ijson.parse(io.BytesIO(json.dumps(RESULTS).encode()))
+
+
+def test_iter_query_descriptions_reads_every_report():
+    reports = list(iter_query_descriptions(_get_events()))
+
+    assert [(query_title, [item.accession for item in items]) for query_title, items in reports] == [
+        ('hcs0', ['P03433', 'P03431']),
+        ('hcs1', []),
+    ]
+    assert reports[0][1][0].taxid == 11320
+    assert reports[0][1][0].sciname == 'Influenza A'
+    assert reports[0][1][1].taxid is None
+
+
+def test_description_collector_only_returns_finished_reports():
+    collector = _DescriptionCollector()
+    events = list(_get_events())
+
+    # The end of the first report is the first event that returns it.
+    first_report_end = next(
+        index for index, event in enumerate(events) if event[:2] == ('BlastOutput2.item', 'end_map')
+    )
+
+    assert all(collector.feed(*event) is None for event in events[:first_report_end])
+    assert collector.feed(*events[first_report_end])[0] == 'hcs0'
+
+
+def test_aiter_query_descriptions_reads_async_events():
+    async def aiter_events():
+        for event in _get_events():
+            yield event
+
+    async def read():
+        return [report async for report in aiter_query_descriptions(aiter_events())]
+
+    assert [query_title for query_title, _ in asyncio.run(read())] == ['hcs0', 'hcs1']
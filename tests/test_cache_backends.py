@@ -0,0 +1,67 @@
+import asyncio
+
+from viva_vdm.core.cache import backends
+from viva_vdm.core.cache.backends import LRUMemoryBackend
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def test_least_recently_read_entries_are_evicted_first():
+    async def run():
+        backend = LRUMemoryBackend(max_entries=2)
+
+        await backend.set('a', '1')
+        await backend.set('b', '2')
+        await backend.get('a')
+        await backend.set('c', '3')
+
+        return [await backend.get(key) for key in ('a', 'b', 'c')]
+
+    assert asyncio.run(run()) == ['1', None, '3']
+
+
+def test_entries_expire(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(backends, 'time', clock)
+
+    async def run():
+        backend = LRUMemoryBackend(max_entries=10)
+
+        await backend.set('a', '1', expire=60)
+        await backend.set('b', '2')
+        clock.now += 30
+        before = [await backend.get_with_ttl(key) for key in ('a', 'b')]
+        clock.now += 31
+        after = [await backend.get_with_ttl(key) for key in ('a', 'b')]
+
+        return before, after, len(backend._store)
+
+    before, after, size = asyncio.run(run())
+
+    assert before == [(30, '1'), (0, '2')]
+    assert after == [(0, None), (0, '2')]
+    assert size == 1
+
+
+def test_clear_by_namespace_or_key():
+    async def run():
+        backend = LRUMemoryBackend(max_entries=10)
+
+        for key in ('cache:a', 'cache:b', 'other:a'):
+            await backend.set(key, key)
+
+        cleared = [
+            await backend.clear(namespace='cache:'),
+            await backend.clear(key='other:a'),
+            await backend.clear(key='missing'),
+        ]
+
+        return cleared, len(backend._store)
+
+    assert asyncio.run(run()) == ([2, 1, 0], 0)
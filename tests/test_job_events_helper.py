@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime
+
+from viva_vdm.core.models import aio
+from viva_vdm.core.models.models import JobStatuses, LoggerContexts, LoggerFlags, LoggerMessages
+from viva_vdm.v1.endpoints.helpers.job_events_helper import JobEventsHelper
+
+
+class _Request(object):
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def _get_entry(message: LoggerMessages) -> dict:
+    return dict(
+        id=message.name,
+        flag=LoggerFlags.info.value,
+        context=LoggerContexts.general.value,
+        timestamp=datetime(2021, 1, 1),
+        message=message.value,
+    )
+
+
+def _read_events(monkeypatch, statuses: list, pages: list) -> list:
+    async def get_job_status(job_id):
+        return statuses.pop(0)
+
+    async def get_job_log_page(job_id, cursor=None, limit=None):
+        return pages.pop(0) if pages else ([], None)
+
+    async def read():
+        helper = JobEventsHelper('job', _Request())
+        helper.poll_interval = 0
+
+        return [event async for event in helper.iter_events()]
+
+    monkeypatch.setattr(aio, 'get_job_status', get_job_status)
+    monkeypatch.setattr(aio, 'get_job_log_page', get_job_log_page)
+
+    return asyncio.run(read())
+
+
+def test_final_log_entry_written_after_the_final_status_is_sent(monkeypatch):
+    # The job is already completed, but its last log entry is only found when the log is read again.
+    pages = [([_get_entry(LoggerMessages.JOB_RUNNING)], None), ([_get_entry(LoggerMessages.JOB_COMPLETED)], None)]
+    events = _read_events(monkeypatch, [JobStatuses.completed], pages)
+
+    assert [next(line for line in event.splitlines() if line.startswith('event:')) for event in events] == [
+        'event: log',
+        'event: log',
+        'event: status',
+    ]
+    assert LoggerMessages.JOB_COMPLETED.value in events[1]
+    assert events[2].endswith(f'data: "{JobStatuses.completed.value}"\n\n')
+
+
+def test_status_changes_are_sent_until_the_job_ends(monkeypatch):
+    events = _read_events(monkeypatch, [JobStatuses.started, JobStatuses.started, JobStatuses.error], list())
+
+    assert [event for event in events if event.startswith('event: status')] == [
+        'event: status\ndata: "started"\n\n',
+        'event: status\ndata: "failed"\n\n',
+    ]
+
+
+def test_stream_ends_when_the_job_is_deleted(monkeypatch):
+    assert _read_events(monkeypatch, [JobStatuses.started], [None]) == list()
+    assert _read_events(monkeypatch, [None], list()) == list()
@@ -0,0 +1,19 @@
+from viva_vdm.v1.endpoints.helpers.ncbi_taxonomy_response_helper import NCBITaxonomyResponseHelper
+
+RESPONSE = (
+    'NSuggest_CreateData("influenza", new Array("Influenza A virus @11320", '
+    '"Influenza B virus @11520", "influenza viruses"), 3);'
+)
+
+
+def test_suggestions_without_a_taxonomy_id_are_skipped():
+    suggestions = NCBITaxonomyResponseHelper(RESPONSE).get_taxonomy_suggestions()
+
+    assert [(suggestion.taxid, suggestion.label) for suggestion in suggestions] == [
+        (11320, 'Influenza A virus @11320'),
+        (11520, 'Influenza B virus @11520'),
+    ]
+
+
+def test_responses_without_suggestions_are_empty():
+    assert NCBITaxonomyResponseHelper('NSuggest_CreateData("xyz", new Array(), 0);').get_taxonomy_suggestions() == []
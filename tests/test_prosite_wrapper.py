@@ -0,0 +1,95 @@
+from viva_vdm.core.prosite.models import PrositeHit, PrositeResult
+from viva_vdm.core.prosite.wrapper import PrositeScan
+
+
+def test_parse_hits_reads_xpsa_headers():
+    lines = [
+        '>hcs0/12-34 motif=PS00001|ASN_GLYCOSYLATION norm_score=8.5 raw_score=104 level=0\n',
+        'NGSGTEKL\n',
+        '>hcs2/3-9 motif=PS00005|PKC_PHOSPHO_SITE level=0\n',
+        'SFR\n',
+    ]
+
+    hits = list(PrositeScan(output_xpsa=True)._parse_hits(lines))
+
+    assert [(hit.sequence_index, hit.accession, hit.start, hit.end) for hit in hits] == [
+        (0, 'PS00001', 12, 34),
+        (2, 'PS00005', 3, 9),
+    ]
+    assert hits[0].fields == {
+        'motif': 'PS00001|ASN_GLYCOSYLATION',
+        'norm_score': '8.5',
+        'raw_score': '104',
+        'level': '0',
+    }
+
+
+def test_parse_hits_reads_the_accession_without_a_motif_field():
+    hits = list(PrositeScan()._parse_hits(['>hcs1/5-20 : PS50011|PROTEIN_KINASE_DOM Protein kinase domain\n']))
+
+    assert [(hit.sequence_index, hit.accession) for hit in hits] == [(1, 'PS50011')]
+
+
+def test_parse_hits_offsets_the_sequence_index():
+    hits = list(PrositeScan()._parse_hits(['>hcs1/1-4 motif=PS00001|ASN_GLYCOSYLATION\n'], offset=25))
+
+    assert hits[0].sequence_index == 26
+
+
+def test_parse_hits_is_lazy():
+    def lines():
+        yield '>hcs0/1-4 motif=PS00001|ASN_GLYCOSYLATION\n'
+        raise AssertionError('The output was read past the first hit')
+
+    assert next(PrositeScan()._parse_hits(lines())).accession == 'PS00001'
+
+
+def test_scan_many_merges_shards_in_sequence_order(monkeypatch):
+    class Store(object):
+        def __init__(self):
+            self.requested = list()
+
+        def get_many(self, accessions):
+            self.requested.append(accessions)
+
+            return {accession: _Record(accession) for accession in accessions}
+
+    store = Store()
+
+    def scan_shard(_, offset, sequences, database_path):
+        for index in range(len(sequences)):
+            yield PrositeHit(
+                sequence_index=offset + index, accession=database_path, start=offset + index, end=99, fields=dict()
+            )
+
+    monkeypatch.setattr(PrositeScan, '_scan_shard', scan_shard)
+    monkeypatch.setattr('viva_vdm.core.prosite.wrapper.PrositeRecordStore', lambda: store)
+    monkeypatch.setattr(
+        'viva_vdm.core.prosite.wrapper.PrositeDatabaseShards',
+        lambda shards: type('Shards', (), {'get_paths': lambda self: ['PS00001', 'PS00002']})(),
+    )
+    monkeypatch.setenv('PROSITE_INSTALL_PATH', 'pfscan')
+    monkeypatch.setenv('PROSITE_DB_PATH', 'prosite.dat')
+    monkeypatch.setenv('PROSITE_WORKERS', '2')
+
+    results = PrositeScan().scan_many(['AAA', 'CCC', 'DDD'])
+
+    assert [[(result.accession, result.start) for result in hits] for hits in results] == [
+        [('PS00001', '0'), ('PS00002', '0')],
+        [('PS00001', '1'), ('PS00002', '1')],
+        [('PS00001', '2'), ('PS00002', '2')],
+    ]
+    # Every record is only read from the store once.
+    assert sorted(accession for accessions in store.requested for accession in accessions) == ['PS00001', 'PS00002']
+
+
+class _Record(object):
+    def __init__(self, accession: str):
+        self.__dict__.update(
+            {
+                name: {int: 0, str: ''}.get(field.outer_type_, list())
+                for name, field in PrositeResult.__fields__.items()
+                if name not in ('start', 'end')
+            }
+        )
+        self.accession = accession
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from viva_vdm.utils import RequestCoalescer
+
+
+def test_concurrent_calls_with_the_same_key_are_coalesced():
+    coalescer = RequestCoalescer()
+    calls = list()
+
+    async def fetch(key: str) -> str:
+        calls.append(key)
+        await asyncio.sleep(0.01)
+
+        return key.upper()
+
+    async def run():
+        results = await asyncio.gather(*(coalescer.run(key, lambda key=key: fetch(key)) for key in 'aab'))
+
+        return results, dict(coalescer._in_flight)
+
+    results, in_flight = asyncio.run(run())
+
+    assert results == ['A', 'A', 'B']
+    assert sorted(calls) == ['a', 'b']
+    assert in_flight == dict()
+
+
+def test_exceptions_are_raised_to_every_caller():
+    coalescer = RequestCoalescer()
+    calls = list()
+
+    async def fail():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+
+        raise ValueError('upstream failed')
+
+    async def run():
+        return await asyncio.gather(coalescer.run('key', fail), coalescer.run('key', fail), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert coalescer._in_flight == dict()
+
+
+def test_calls_after_completion_are_not_coalesced():
+    coalescer = RequestCoalescer()
+    calls = list()
+
+    async def fetch() -> int:
+        calls.append(None)
+
+        return len(calls)
+
+    async def run():
+        return [await coalescer.run('key', fetch), await coalescer.run('key', fetch)]
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_cancelled_callers_do_not_cancel_the_call():
+    coalescer = RequestCoalescer()
+
+    async def fetch() -> str:
+        await asyncio.sleep(0.01)
+
+        return 'done'
+
+    async def run():
+        first = asyncio.ensure_future(coalescer.run('key', fetch))
+        second = asyncio.ensure_future(coalescer.run('key', fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        return await second
+
+    assert asyncio.run(run()) == 'done'
@@ -0,0 +1,119 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from bson import ObjectId
+
+from viva_vdm.core.models import aio
+from viva_vdm.v1.endpoints.helpers.results_export_helper import ResultsExportError, ResultsExportHelper
+from viva_vdm.v1.models.results import ExportCompressions, ExportFormats
+
+HCS_ID = ObjectId()
+
+HCS = {
+    '_id': HCS_ID,
+    'sequence': 'MDSNTVSSFQDI',
+    'incidence': 87.5,
+    'position': 10,
+    'results': {
+        'prosite': [{'accession': 'PS00001', 'description': 'ASN_GLYCOSYLATION', 'start': 2, 'end': 5}],
+        'blast': [{'accession': 'P03433', 'title': 'Polymerase', 'taxid': 11320}],
+        'mhci': {'A1': [{'allele': 'HLA-A*01:01', 'sequence': 'MDSNTVSSF', 'percentile': 0.4}], 'A2': []},
+        'mhcii': None,
+    },
+}
+EMPTY_HCS = {'_id': ObjectId(), 'sequence': 'QDIL', 'incidence': 12.5, 'position': 20}
+
+
+def _get_helper(export_format: ExportFormats, compression: ExportCompressions = ExportCompressions.none):
+    return ResultsExportHelper('job', [HCS['_id'], EMPTY_HCS['_id']], export_format, compression)
+
+
+def _read_file(helper: ResultsExportHelper, batches: list, monkeypatch) -> bytes:
+    async def iter_hcs_batches(hcs_ids, fields=None, batch_size=None):
+        for batch in batches:
+            yield batch
+
+    async def read():
+        return b''.join([chunk async for chunk in helper.iter_file()])
+
+    monkeypatch.setattr(aio, 'iter_hcs_batches', iter_hcs_batches)
+
+    return asyncio.run(read())
+
+
+def test_iter_rows_has_a_row_per_result():
+    rows = list(ResultsExportHelper._iter_rows(HCS))
+
+    assert [row['analysis'] for row in rows] == ['prosite', 'blast', 'mhci']
+    assert all(row['hcs_id'] == str(HCS_ID) and row['sequence'] == 'MDSNTVSSFQDI' for row in rows)
+    assert rows[0]['accession'] == 'PS00001'
+    assert rows[2]['supertype'] == 'A1'
+    assert rows[2]['allele'] == 'HLA-A*01:01'
+    assert rows[2]['epitope'] == 'MDSNTVSSF'
+    assert rows[2]['percentile'] == 0.4
+
+
+def test_iter_rows_has_a_row_for_hcs_without_results():
+    rows = list(ResultsExportHelper._iter_rows(EMPTY_HCS))
+
+    assert rows == [{'hcs_id': str(EMPTY_HCS['_id']), 'sequence': 'QDIL', 'incidence': 12.5, 'position': 20}]
+
+
+def test_ndjson_has_a_line_per_hcs():
+    lines = _get_helper(ExportFormats.ndjson)._encode_ndjson([HCS, EMPTY_HCS]).decode().splitlines()
+
+    assert [json.loads(line)['_id'] for line in lines] == [str(HCS_ID), str(EMPTY_HCS['_id'])]
+
+
+def test_csv_header_is_only_written_once():
+    encode = _get_helper(ExportFormats.csv)._get_csv_encoder()
+    data = (encode([HCS]) + encode([EMPTY_HCS])).decode()
+    rows = list(csv.reader(io.StringIO(data)))
+
+    assert rows[0] == ResultsExportHelper.ROW_FIELDS
+    assert len(rows) == 5
+    assert rows.count(ResultsExportHelper.ROW_FIELDS) == 1
+
+
+def test_gzip_export_can_be_decompressed(monkeypatch):
+    helper = _get_helper(ExportFormats.ndjson, ExportCompressions.gzip)
+    data = gzip.decompress(_read_file(helper, [[HCS], [EMPTY_HCS]], monkeypatch))
+
+    assert helper.filename == 'job.ndjson.gz'
+    assert helper.media_type == 'application/gzip'
+    assert len(data.decode().splitlines()) == 2
+
+
+def test_zstd_export_can_be_decompressed(monkeypatch):
+    zstandard = pytest.importorskip('zstandard')
+
+    helper = _get_helper(ExportFormats.csv, ExportCompressions.zstd)
+    data = zstandard.ZstdDecompressor().decompressobj().decompress(_read_file(helper, [[HCS]], monkeypatch))
+
+    assert helper.filename == 'job.csv.zst'
+    assert len(data.decode().splitlines()) == 4
+
+
+def test_parquet_export_has_a_row_per_result(monkeypatch):
+    pyarrow = pytest.importorskip('pyarrow')
+    pytest.importorskip('pyarrow.parquet')
+
+    helper = _get_helper(ExportFormats.parquet, ExportCompressions.gzip)
+    table = pyarrow.parquet.read_table(pyarrow.BufferReader(_read_file(helper, [[HCS], [EMPTY_HCS]], monkeypatch)))
+
+    assert helper.filename == 'job.parquet'
+    assert table.num_rows == 4
+    assert table.column_names == ResultsExportHelper.ROW_FIELDS
+
+
+def test_missing_optional_dependencies_are_reported(monkeypatch):
+    from viva_vdm.v1.endpoints.helpers import results_export_helper
+
+    monkeypatch.setattr(results_export_helper, 'zstandard', None)
+
+    with pytest.raises(ResultsExportError):
+        _get_helper(ExportFormats.csv, ExportCompressions.zstd)
@@ -0,0 +1,54 @@
+import pytest
+
+from viva_vdm.core.taxonomy import TaxonomyIndex
+
+NAMES = [
+    (9606, 'Homo sapiens', 'scientific name'),
+    (9606, 'human', 'genbank common name'),
+    (9606, 'man', 'common name'),
+    (9606, 'Homo sapiens Linnaeus, 1758', 'authority'),
+    (11320, 'Influenza A virus', 'scientific name'),
+    (11320, 'influenza A', 'common name'),
+    (11320, 'Influenza virus type A', 'equivalent name'),
+    (11520, 'Influenza B virus', 'scientific name'),
+    (11552, 'Influenza C virus', 'scientific name'),
+]
+
+
+@pytest.fixture
+def index(tmp_path) -> TaxonomyIndex:
+    names_path = tmp_path / 'names.dmp'
+    names_path.write_text(
+        ''.join(f'{taxid}\t|\t{name}\t|\t\t|\t{name_class}\t|\n' for taxid, name, name_class in NAMES),
+        encoding='utf-8',
+    )
+
+    index = TaxonomyIndex(str(names_path))
+    index.build()
+
+    return index
+
+
+def test_search_by_prefix_ignoring_case(index):
+    assert index.is_available()
+    assert index.search('  INFLUENZA B') == [(11520, 'Influenza B virus')]
+    assert index.search('influenza a') == [(11320, 'Influenza A virus')]
+
+
+def test_search_returns_every_taxon_once_by_its_scientific_name(index):
+    assert index.search('influenza') == [
+        (11320, 'Influenza A virus'),
+        (11520, 'Influenza B virus'),
+        (11552, 'Influenza C virus'),
+    ]
+    assert index.search('hum') == [(9606, 'Homo sapiens')]
+    assert index.search('ho') == [(9606, 'Homo sapiens')]
+
+
+def test_search_is_limited_to_distinct_taxa(index):
+    assert index.search('influenza', limit=2) == [(11320, 'Influenza A virus'), (11520, 'Influenza B virus')]
+
+
+def test_other_name_classes_are_not_indexed(index):
+    assert index.search('influenza virus type') == list()
+    assert index.search('') == list()
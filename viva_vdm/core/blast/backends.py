@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+import tempfile
+from subprocess import PIPE, Popen, run
+from typing import List, Literal, Optional
+
+import ijson
+
+from .client import AsyncBlastClient
+from .constants import Backends, Databases, Matrices, OutputFormats
+from .exceptions import LocalBlastException
+from .models import BlastResults, DescriptionItem
+from .parsers import iter_query_descriptions
+from .queries import assign_query_results, fasta_from_sequences, split_query_results
+from ..settings import AppConfig
+
+
+class BlastBackendBase(object):
+    def __init__(self, *, database: Literal['VNR', 'HumanNR', 'pdbaa'], exclude_taxid: Optional[int] = None):
+        """
+        This constructor is common for all BLAST backends. It is recommended to not use this directly, but through the
+        factory.
+
+        :param database: The BLAST database to search.
+        :param exclude_taxid: A taxonomy ID to exclude from the results.
+
+        :type database: Literal['VNR', 'HumanNR', 'pdbaa']
+        :type exclude_taxid: int
+        """
+
+        self.database = Databases(database)
+        self.exclude_taxid = exclude_taxid
+        self.settings = AppConfig()
+
+    def blast_many(self, sequences: List[str]) -> List[BlastResults]:
+        """
+        BLASTs many sequences.
+
+        :param sequences: The sequences to BLAST.
+        :type sequences: List[str]
+
+        :return: The results of every sequence, in the order of the sequences.
+        """
+
+        ...
+
+    def blast_descriptions_many(self, sequences: List[str]) -> List[List[DescriptionItem]]:
+        """
+        BLASTs many sequences, and only reads the hit descriptions out of the results, which is all the workflow keeps.
+        The results are parsed incrementally, so they are never loaded in memory as a whole.
+
+        :param sequences: The sequences to BLAST.
+        :type sequences: List[str]
+
+        :return: The hit descriptions of every sequence, in the order of the sequences.
+        """
+
+        ...
+
+
+class RemoteBlastBackend(BlastBackendBase):
+    def blast_many(self, sequences: List[str]) -> List[BlastResults]:
+        """
+        BLASTs many sequences concurrently on the BVU BLAST server.
+        """
+
+        return asyncio.run(self._blast_many(sequences, descriptions_only=False))
+
+    def blast_descriptions_many(self, sequences: List[str]) -> List[List[DescriptionItem]]:
+        """
+        BLASTs many sequences concurrently on the BVU BLAST server, streaming the hit descriptions out of the results.
+        """
+
+        return asyncio.run(self._blast_many(sequences, descriptions_only=True))
+
+    async def _blast_many(self, sequences: List[str], descriptions_only: bool) -> list:
+        async with AsyncBlastClient(database=self.database.value, exclude_taxid=self.exclude_taxid) as client:
+            return await client.blast_many(sequences, descriptions_only)
+
+
+class LocalBlastBackend(BlastBackendBase):
+    def _generate_arguments(self, query_path: str) -> List[str]:
+        arguments = [
+            self.settings.blast_exe_path,
+            '-query',
+            query_path,
+            '-db',
+            os.path.join(self.settings.blast_db_dir, self.database.value),
+            '-matrix',
+            Matrices.BLOSSUM62.value,
+            '-outfmt',
+            str(OutputFormats.JSON.value),
+            '-num_threads',
+            str(max(1, self.settings.blast_threads)),
+        ]
+
+        if self.exclude_taxid:
+            # Requires a database formatted with taxonomy IDs (makeblastdb -parse_seqids -taxid_map).
+            arguments += ['-negative_taxids', str(self.exclude_taxid)]
+
+        return arguments
+
+    def blast_many(self, sequences: List[str]) -> List[BlastResults]:
+        """
+        BLASTs many sequences as a single multi-query search with the local BLAST+ ``blastp``, using
+        ``blast_threads`` threads.
+        """
+
+        if not sequences:
+            return list()
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.fasta', delete=False) as f:
+            f.write(fasta_from_sequences(sequences))
+
+        try:
+            process = run(self._generate_arguments(f.name), stdout=PIPE, stderr=PIPE)
+        finally:
+            os.remove(f.name)
+
+        if process.returncode != 0:
+            raise LocalBlastException(process.stderr.decode('utf-8'))
+
+        return split_query_results(BlastResults(**json.loads(process.stdout)), len(sequences))
+
+    def blast_descriptions_many(self, sequences: List[str]) -> List[List[DescriptionItem]]:
+        """
+        BLASTs many sequences as a single multi-query search with the local BLAST+ ``blastp``, and parses the hit
+        descriptions out of its output while it is written.
+        """
+
+        if not sequences:
+            return list()
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.fasta', delete=False) as f:
+            f.write(fasta_from_sequences(sequences))
+
+        try:
+            with tempfile.TemporaryFile() as stderr, Popen(
+                self._generate_arguments(f.name), stdout=PIPE, stderr=stderr
+            ) as process:
+                try:
+                    reports = list(iter_query_descriptions(ijson.parse(process.stdout)))
+                except BaseException:
+                    process.kill()
+                    raise
+
+                if process.wait() != 0:
+                    stderr.seek(0)
+                    raise LocalBlastException(stderr.read().decode('utf-8'))
+        finally:
+            os.remove(f.name)
+
+        return assign_query_results(reports, len(sequences))
+
+
+class BlastBackendFactory(object):
+    def __new__(
+        cls,
+        *,
+        database: Literal['VNR', 'HumanNR', 'pdbaa'],
+        exclude_taxid: Optional[int] = None,
+        backend: Optional[Backends] = None,
+    ):
+        """
+        This factory method should be used to get the BLAST backend.
+
+        :param database: The BLAST database to search.
+        :param exclude_taxid: A taxonomy ID to exclude from the results.
+        :param backend: One of the BLAST backends (default: the BLAST_BACKEND setting).
+
+        :type database: Literal['VNR', 'HumanNR', 'pdbaa']
+        :type exclude_taxid: int
+        :type backend: Backends
+
+        Example:
+            >>> from viva_vdm.core.blast.backends import BlastBackendFactory
+            >>> from viva_vdm.core.blast.constants import Backends
+            >>> blast_backend = BlastBackendFactory(database='VNR', exclude_taxid=11320, backend=Backends.LOCAL)
+            >>> results = blast_backend.blast_many(["MDSNTVSSFQDILLRMSKMQLGSSSEDLNGMITQFESLKLYRDSLGEAVMRMG"])
+        """
+
+        backend = backend or Backends(AppConfig().blast_backend)
+
+        if backend == Backends.REMOTE:
+            return RemoteBlastBackend(database=database, exclude_taxid=exclude_taxid)
+        elif backend == Backends.LOCAL:
+            return LocalBlastBackend(database=database, exclude_taxid=exclude_taxid)
+
+        raise NotImplementedError(f'The backend {backend} is not implemented')
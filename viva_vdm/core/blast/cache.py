@@ -0,0 +1,85 @@
+import json
+import threading
+import zlib
+from typing import Any, Dict, Optional
+
+from ..cache import ResultCache
+from ..models import LoggerContexts
+from ..settings import AppConfig
+
+
+class BlastResultCache(ResultCache):
+    _stats = {'hits': 0, 'misses': 0}
+    _stats_lock = threading.Lock()
+
+    def __init__(
+        self,
+        *,
+        database: str,
+        exclude_taxid: Optional[int] = None,
+        release: Optional[str] = None,
+        backend: Optional[str] = None,
+    ):
+        """
+        The result cache of BLAST searches. On top of the ``ResultCache`` (TTL and size-bounded eviction), the hits
+        are stored compressed, since they can be large for hit-heavy proteins, and the hits and misses of the cache
+        are counted for every process.
+
+        :param database: The BLAST database searched.
+        :param exclude_taxid: The taxonomy ID excluded from the results.
+        :param release: The release of the BLAST database (default: BLAST_DATABASE_RELEASE).
+        :param backend: The BLAST backend the searches run on (default: BLAST_BACKEND).
+
+        :type database: str
+        :type exclude_taxid: int
+        :type release: str
+        :type backend: str
+
+        Example:
+            >>> from viva_vdm.core.blast.cache import BlastResultCache
+            >>> cache = BlastResultCache(database='VNR', exclude_taxid=11320)
+            >>> cache.set("MDSNTVSSFQDI", [])
+            >>> cache.get("MDSNTVSSFQDI")
+            []
+            >>> BlastResultCache.get_stats()
+            {'hits': 1, 'misses': 0}
+        """
+
+        app_settings = AppConfig()
+
+        super(BlastResultCache, self).__init__(
+            stage=LoggerContexts.blast,
+            method=database,
+            parameters={'exclude_taxid': exclude_taxid, 'backend': backend or app_settings.blast_backend},
+            version=release or app_settings.blast_database_release,
+        )
+
+    @classmethod
+    def _count(cls, outcome: str):
+        with cls._stats_lock:
+            cls._stats[outcome] += 1
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """
+        :return: The number of hits and misses of the BLAST result cache in this process.
+        """
+
+        with cls._stats_lock:
+            return dict(cls._stats)
+
+    def get(self, sequence: str) -> Optional[Any]:
+        compressed = super(BlastResultCache, self).get(sequence)
+
+        if compressed is None:
+            self._count('misses')
+            return None
+
+        self._count('hits')
+
+        return json.loads(zlib.decompress(compressed))
+
+    def set(self, sequence: str, result: Any):
+        compressed = zlib.compress(json.dumps(result, separators=(',', ':')).encode('utf-8'))
+
+        super(BlastResultCache, self).set(sequence, compressed)
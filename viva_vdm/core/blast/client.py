@@ -0,0 +1,266 @@
+import asyncio
+import json
+import random
+from typing import AsyncIterator, List, Literal, Optional, Tuple, Union
+
+import aiohttp
+import ijson
+
+from .exceptions import BlastException
+from .models import BlastResults, DescriptionItem
+from .parsers import aiter_query_descriptions
+from .queries import assign_query_results, fasta_from_sequences, split_query_results
+from .wrapper import BVU_BLAST_BASE_URL
+from ..settings import AppConfig
+
+
+class AsyncBlastClient(object):
+    # The poll interval stops growing long before this, the cap only keeps ``2 ** attempt`` from overflowing.
+    MAX_POLL_EXPONENT = 16
+
+    def __init__(
+        self,
+        *,
+        database: Literal['VNR', 'HumanNR', 'pdbaa'],
+        exclude_taxid: Optional[int] = None,
+        base_url: str = BVU_BLAST_BASE_URL,
+        max_in_flight: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_poll_interval: Optional[float] = None,
+        queries_per_job: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        An asyncio client of the BVU BLAST API. All the requests of the client share a pooled HTTP session, at most
+        ``max_in_flight`` BLAST jobs are running at a time, and the status of every job is polled with an exponential,
+        jittered backoff. Use it as an async context manager.
+
+        :param database: The BLAST database to search.
+        :param exclude_taxid: A taxonomy ID to exclude from the results.
+        :param base_url: The base URL of the BLAST API, e.g. of a local stand-in server.
+        :param max_in_flight: The maximum number of BLAST jobs running at a time (default: BLAST_MAX_IN_FLIGHT).
+        :param poll_interval: The first interval between status checks in seconds (default: BLAST_POLL_INTERVAL).
+        :param max_poll_interval: The longest interval between status checks (default: BLAST_MAX_POLL_INTERVAL).
+        :param queries_per_job: The number of sequences submitted as one multi-query BLAST job (default:
+            BLAST_QUERIES_PER_JOB).
+        :param timeout: How long to wait for a BLAST job to complete in seconds (default: BLAST_TIMEOUT).
+
+        :type database: Literal['VNR', 'HumanNR', 'pdbaa']
+        :type exclude_taxid: int
+        :type base_url: str
+        :type max_in_flight: int
+        :type poll_interval: float
+        :type max_poll_interval: float
+        :type queries_per_job: int
+        :type timeout: float
+
+        Example:
+            >>> import asyncio
+            >>> from viva_vdm.core.blast.client import AsyncBlastClient
+            >>> async def blast():
+            ...     async with AsyncBlastClient(database='VNR', exclude_taxid=11320) as client:
+            ...         return await client.blast_many(["MDSNTVSSFQDILLRMSKMQLGSSSEDLNGMITQFESLKLYRDSLGEAVMRMG"])
+            >>> results = asyncio.run(blast())
+        """
+
+        settings = AppConfig()
+
+        self.database = database
+        self.exclude_taxid = exclude_taxid
+        self.base_url = base_url.rstrip('/')
+        self.max_in_flight = max(1, max_in_flight or settings.blast_max_in_flight)
+        self.poll_interval = poll_interval or settings.blast_poll_interval
+        self.max_poll_interval = max_poll_interval or settings.blast_max_poll_interval
+        self.queries_per_job = max(1, queries_per_job or settings.blast_queries_per_job)
+        self.timeout = timeout or settings.blast_timeout
+
+        self._session = None  # type: Optional[aiohttp.ClientSession]
+        self._in_flight = None  # type: Optional[asyncio.Semaphore]
+
+    async def __aenter__(self) -> 'AsyncBlastClient':
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_in_flight, ssl=False),
+            raise_for_status=True,
+        )
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+        return self
+
+    async def __aexit__(self, *_):
+        await self._session.close()
+
+    async def submit(self, hcs: str) -> str:
+        """
+        Creates a BLAST job.
+
+        :param hcs: The sequence to BLAST, or many sequences in FASTA format.
+        :type hcs: str
+
+        :return: The ID of the BLAST job.
+        """
+
+        data = dict(sequence=hcs, db=self.database)
+
+        if self.exclude_taxid:
+            data['exclude_taxid'] = self.exclude_taxid
+
+        async with self._session.post(f'{self.base_url}/job/create', json=data) as response:
+            job_id = (await response.text()).strip('"')
+
+        print(f'Blast job id: {job_id} created')
+
+        return job_id
+
+    def _get_poll_delay(self, attempt: int) -> float:
+        delay = min(self.max_poll_interval, self.poll_interval * 2 ** min(attempt, self.MAX_POLL_EXPONENT))
+
+        # Jitter keeps the many jobs of a batch from polling in lock step.
+        return random.uniform(delay / 2, delay)
+
+    async def _wait_for_completion(self, job_id: str):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        attempt = 0
+
+        while True:
+            async with self._session.get(f'{self.base_url}/job/status/{job_id}') as response:
+                status = int(await response.text())
+
+            if status == 3:
+                return
+            elif status == 2:
+                raise BlastException(job_id)
+
+            if loop.time() >= deadline:
+                raise BlastException(job_id, f'not completed after {self.timeout:g} seconds')
+
+            # The job is polled one last time at the deadline.
+            await asyncio.sleep(min(self._get_poll_delay(attempt), deadline - loop.time()))
+            attempt += 1
+
+    async def wait(self, job_id: str) -> BlastResults:
+        """
+        Waits for a BLAST job to complete, and fetches its results.
+
+        :param job_id: The ID of the BLAST job.
+        :type job_id: str
+
+        :return: The results of the BLAST job.
+        """
+
+        await self._wait_for_completion(job_id)
+
+        async with self._session.get(f'{self.base_url}/static/{job_id}.json') as response:
+            results_string = await response.text()
+
+        return BlastResults(**json.loads(results_string))
+
+    async def wait_descriptions(self, job_id: str) -> List[Tuple[str, List[DescriptionItem]]]:
+        """
+        Waits for a BLAST job to complete, and streams the hit descriptions out of its results, without loading the
+        whole results (e.g. the alignments) in memory.
+
+        :param job_id: The ID of the BLAST job.
+        :type job_id: str
+
+        :return: The title of the query and the hit descriptions of every report of the BLAST job.
+        """
+
+        await self._wait_for_completion(job_id)
+
+        async with self._session.get(f'{self.base_url}/static/{job_id}.json') as response:
+            return [report async for report in aiter_query_descriptions(ijson.parse_async(response.content))]
+
+    async def blast(self, hcs: str) -> BlastResults:
+        """
+        BLASTs a single sequence, once there is room for another job in flight.
+
+        :param hcs: The sequence to BLAST.
+        :type hcs: str
+
+        :return: The results of the BLAST job.
+        """
+
+        return (await self.blast_batch([hcs]))[0]
+
+    async def blast_batch(
+        self, sequences: List[str], descriptions_only: bool = False
+    ) -> Union[List[BlastResults], List[List[DescriptionItem]]]:
+        """
+        BLASTs many sequences as a single multi-query BLAST job, once there is room for another job in flight, so
+        that only one job has to be created and polled.
+
+        :param sequences: The sequences to BLAST.
+        :param descriptions_only: Only stream the hit descriptions out of the results (see ``wait_descriptions``).
+
+        :type sequences: List[str]
+        :type descriptions_only: bool
+
+        :return: The results, or the hit descriptions, of every sequence, in the order of the sequences.
+        """
+
+        query = sequences[0] if len(sequences) == 1 else fasta_from_sequences(sequences)
+
+        async with self._in_flight:
+            job_id = await self.submit(query)
+
+            if descriptions_only:
+                return assign_query_results(await self.wait_descriptions(job_id), len(sequences))
+
+            return split_query_results(await self.wait(job_id), len(sequences))
+
+    async def iter_blast_many(
+        self, sequences: List[str], descriptions_only: bool = False
+    ) -> AsyncIterator[Tuple[int, Union[BlastResults, List[DescriptionItem]]]]:
+        """
+        BLASTs many sequences concurrently, ``queries_per_job`` sequences per BLAST job, and yields the results as soon
+        as every job completes.
+
+        :param sequences: The sequences to BLAST.
+        :param descriptions_only: Only stream the hit descriptions out of the results (see ``wait_descriptions``).
+
+        :type sequences: List[str]
+        :type descriptions_only: bool
+
+        :return: The index of the sequence and its results, or hit descriptions, in the order the jobs complete.
+        """
+
+        async def blast(offset: int, batch: List[str]) -> Tuple[int, list]:
+            return offset, await self.blast_batch(batch, descriptions_only)
+
+        tasks = [
+            asyncio.ensure_future(blast(offset, sequences[offset : offset + self.queries_per_job]))  # noqa: E203
+            for offset in range(0, len(sequences), self.queries_per_job)
+        ]
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                offset, results = await task
+
+                for index, result in enumerate(results, start=offset):
+                    yield index, result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def blast_many(
+        self, sequences: List[str], descriptions_only: bool = False
+    ) -> Union[List[BlastResults], List[List[DescriptionItem]]]:
+        """
+        BLASTs many sequences concurrently.
+
+        :param sequences: The sequences to BLAST.
+        :param descriptions_only: Only stream the hit descriptions out of the results (see ``wait_descriptions``).
+
+        :type sequences: List[str]
+        :type descriptions_only: bool
+
+        :return: The results, or the hit descriptions, of every sequence, in the order of the sequences.
+        """
+
+        results = [None] * len(sequences)
+
+        async for index, result in self.iter_blast_many(sequences, descriptions_only):
+            results[index] = result
+
+        return results
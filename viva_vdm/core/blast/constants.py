@@ -4,6 +4,9 @@ from enum import Enum
 class Databases(Enum):
     NON_REDUNDANT = 'nr'
     PDB = 'pdb'
+    VIRUS_NON_REDUNDANT = 'VNR'
+    HUMAN_NON_REDUNDANT = 'HumanNR'
+    PDB_AA = 'pdbaa'
 
 
 class Matrices(Enum):
@@ -11,6 +14,11 @@ class Matrices(Enum):
     PAM30 = 'PAM30'
 
 
+class Backends(Enum):
+    REMOTE = 'remote'
+    LOCAL = 'local'
+
+
 class OutputFormats(Enum):
     JSON = 15
     XML = 16
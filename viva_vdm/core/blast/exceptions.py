@@ -1,9 +1,11 @@
+from typing import Optional
+
 from .constants import OutputFormats
 
 
 class BlastException(Exception):
-    def __init__(self, job_id: str):
-        msg = f'Error in Blast job {job_id}'
+    def __init__(self, job_id: str, reason: Optional[str] = None):
+        msg = f'Error in Blast job {job_id}: {reason}' if reason else f'Error in Blast job {job_id}'
 
         super(BlastException, self).__init__(msg)
 
@@ -11,3 +13,8 @@ class BlastException(Exception):
 class NotImplementedException(Exception):
     def __init__(self, method: OutputFormats):
         super(NotImplementedException, self).__init__(f"This output method is not implemented: {method}")
+
+
+class LocalBlastException(Exception):
+    def __init__(self, error: str):
+        super(LocalBlastException, self).__init__(f'Running the BLAST+ CLI tool failed:\n\t{error}')
@@ -0,0 +1,85 @@
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+from .models import DescriptionItem
+
+REPORT_PREFIX = 'BlastOutput2.item'
+QUERY_TITLE_PREFIX = f'{REPORT_PREFIX}.report.results.search.query_title'
+DESCRIPTION_PREFIX = f'{REPORT_PREFIX}.report.results.search.hits.item.description.item'
+
+DESCRIPTION_FIELDS = {f'{DESCRIPTION_PREFIX}.{name}': name for name in ('id', 'accession', 'title', 'taxid', 'sciname')}
+
+
+class _DescriptionCollector(object):
+    """
+    Collects the hit descriptions of every report from the events of an incremental JSON parser (ijson), skipping
+    everything else, e.g. the alignments of the HSPs.
+    """
+
+    def __init__(self):
+        self.query_title = None  # type: Optional[str]
+        self.descriptions = list()  # type: List[DescriptionItem]
+        self.description = None  # type: Optional[dict]
+
+    def feed(self, prefix: str, event: str, value: Any) -> Optional[Tuple[str, List[DescriptionItem]]]:
+        if self.description is not None and prefix in DESCRIPTION_FIELDS:
+            self.description[DESCRIPTION_FIELDS[prefix]] = value
+        elif prefix == DESCRIPTION_PREFIX:
+            if event == 'start_map':
+                self.description = dict()
+            elif event == 'end_map':
+                self.descriptions.append(DescriptionItem(**self.description))
+                self.description = None
+        elif prefix == QUERY_TITLE_PREFIX:
+            self.query_title = value
+        elif prefix == REPORT_PREFIX and event == 'end_map':
+            report = (self.query_title, self.descriptions)
+
+            self.query_title = None
+            self.descriptions = list()
+
+            return report
+
+        return None
+
+
+def iter_query_descriptions(events: Iterable[Tuple[str, str, Any]]) -> Iterator[Tuple[str, List[DescriptionItem]]]:
+    """
+    Reads the hit descriptions of a BLAST JSON (-outfmt 15) result from the events of ``ijson.parse``, so that the
+    result never has to be loaded in memory as a whole.
+
+    :param events: The events of ``ijson.parse``.
+    :type events: Iterable[Tuple[str, str, Any]]
+
+    :return: The title of the query and the hit descriptions of every report, in the order of the reports.
+
+    Example:
+        >>> import ijson
+        >>> from viva_vdm.core.blast.parsers import iter_query_descriptions
+        >>> with open('results.json', 'rb') as f:
+        ...     for query_title, descriptions in iter_query_descriptions(ijson.parse(f)):
+        ...         print(query_title, len(descriptions))
+    """
+
+    collector = _DescriptionCollector()
+
+    for prefix, event, value in events:
+        report = collector.feed(prefix, event, value)
+
+        if report is not None:
+            yield report
+
+
+async def aiter_query_descriptions(
+    events: AsyncIterable[Tuple[str, str, Any]]
+) -> AsyncIterator[Tuple[str, List[DescriptionItem]]]:
+    """
+    Same as ``iter_query_descriptions``, for the events of ``ijson.parse_async``, e.g. over an HTTP response.
+    """
+
+    collector = _DescriptionCollector()
+
+    async for prefix, event, value in events:
+        report = collector.feed(prefix, event, value)
+
+        if report is not None:
+            yield report
@@ -0,0 +1,71 @@
+from typing import Any, Iterable, List, Tuple
+
+from .models import BlastResults
+
+QUERY_TITLE_PREFIX = 'hcs'
+
+
+def fasta_from_sequences(sequences: List[str]) -> str:
+    """
+    Converts many sequences into a multi-query FASTA. The header of every sequence is derived from its position, so
+    that the reports of a multi-query BLAST search can be assigned back to it.
+
+    :param sequences: A list of amino-acid sequences.
+    :type sequences: List[str]
+
+    :return: FASTA-formatted sequences.
+    """
+
+    return ''.join(f'>{QUERY_TITLE_PREFIX}{index}\n{sequence}\n' for index, sequence in enumerate(sequences))
+
+
+def assign_query_results(query_results: Iterable[Tuple[str, Any]], count: int) -> List[Any]:
+    """
+    Assigns the results of the queries of a multi-query BLAST search back to their queries.
+
+    :param query_results: The title of every query and its results, in the order of the reports of the search.
+    :param count: The number of queries of the search.
+
+    :type query_results: Iterable[Tuple[str, Any]]
+    :type count: int
+
+    :return: The results of every query, in the order of the queries.
+    """
+
+    results = [None] * count
+
+    for position, (query_title, result) in enumerate(query_results):
+        title_index = query_title[len(QUERY_TITLE_PREFIX) :]  # noqa: E203
+
+        # The title of the query is its FASTA header, which holds its index. The position of the report is only relied
+        # on if the title was not kept.
+        if query_title.startswith(QUERY_TITLE_PREFIX) and title_index.isdigit():
+            results[int(title_index)] = result
+        else:
+            results[position] = result
+
+    missing = [index for index, result in enumerate(results) if result is None]
+
+    if missing:
+        raise ValueError(f'BLAST search returned no report for queries {missing}')
+
+    return results
+
+
+def split_query_results(results: BlastResults, count: int) -> List[BlastResults]:
+    """
+    Splits the results of a multi-query BLAST search into the results of every query.
+
+    :param results: The results of a search for sequences converted with ``fasta_from_sequences``.
+    :param count: The number of queries of the search.
+
+    :type results: BlastResults
+    :type count: int
+
+    :return: The results of every query, in the order of the queries.
+    """
+
+    return assign_query_results(
+        ((item.report.results.search.query_title, BlastResults(BlastOutput2=[item])) for item in results.BlastOutput2),
+        count,
+    )
@@ -0,0 +1,2 @@
+from .result_cache import ResultCache
+from .backends import CacheBackendFactory, LRUMemoryBackend, MongoCacheBackend
@@ -0,0 +1,130 @@
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Literal, Optional, Tuple
+
+from fastapi_cache.backends import Backend
+
+from viva_vdm.core.models import aio
+from viva_vdm.core.settings import ResourceConfig
+
+
+class LRUMemoryBackend(Backend):
+    def __init__(self, max_entries: int):
+        """
+        A response cache held in the memory of the process, bounded to ``max_entries`` entries. The least recently
+        read entries are evicted first.
+
+        :param max_entries: The maximum number of entries in the cache.
+        :type max_entries: int
+        """
+
+        self.max_entries = max_entries
+
+        # Every entry is its value and the time it expires at, in the order the entries were last read or written.
+        self._store: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+
+    def _get(self, key: str) -> Optional[Tuple[str, float]]:
+        entry = self._store.get(key)
+
+        if entry is None:
+            return None
+
+        if entry[1] < time.time():
+            del self._store[key]
+
+            return None
+
+        self._store.move_to_end(key)
+
+        return entry
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[str]]:
+        entry = self._get(key)
+
+        if entry is None:
+            return 0, None
+
+        value, expires_at = entry
+
+        return (0 if math.isinf(expires_at) else int(expires_at - time.time())), value
+
+    async def get(self, key: str) -> Optional[str]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: str, expire: Optional[int] = None) -> None:
+        self._store[key] = (value, time.time() + expire if expire else math.inf)
+        self._store.move_to_end(key)
+
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        if namespace:
+            keys = [stored_key for stored_key in self._store if stored_key.startswith(namespace)]
+        else:
+            keys = [key] if key in self._store else list()
+
+        for stored_key in keys:
+            del self._store[stored_key]
+
+        return len(keys)
+
+
+class MongoCacheBackend(Backend):
+    """
+    A response cache stored in Mongo, and so shared by every replica of the API, and kept across restarts. Entries
+    expire with a TTL index on ``ApiCacheDBModel.expires_at``.
+    """
+
+    NEVER_EXPIRES = datetime(9999, 12, 31)
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[str]]:
+        entry = await aio.get_api_cache_entry(key)
+
+        # Mongo only removes expired documents once a minute, so they may still be found for a short while.
+        if entry is None or entry['expires_at'] < datetime.utcnow():
+            return 0, None
+
+        if entry['expires_at'] >= self.NEVER_EXPIRES:
+            return 0, entry['value']
+
+        return int((entry['expires_at'] - datetime.utcnow()).total_seconds()), entry['value']
+
+    async def get(self, key: str) -> Optional[str]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: str, expire: Optional[int] = None) -> None:
+        expires_at = datetime.utcnow() + timedelta(seconds=expire) if expire else self.NEVER_EXPIRES
+
+        await aio.set_api_cache_entry(key, value, expires_at)
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        return await aio.clear_api_cache_entries(namespace=namespace, key=key)
+
+
+class CacheBackendFactory(object):
+    def __new__(cls, backend: Optional[Literal['memory', 'mongo']] = None) -> Backend:
+        """
+        Creates the response cache backend of the API.
+
+        :param backend: The type of backend (default: the API_CACHE_BACKEND setting). "memory" caches are per process
+            and bounded to API_CACHE_MAX_ENTRIES entries, "mongo" caches are shared by every replica of the API.
+        :type backend: Literal['memory', 'mongo']
+
+        :return: The cache backend.
+
+        Example:
+            >>> from fastapi_cache import FastAPICache
+            >>> from viva_vdm.core.cache import CacheBackendFactory
+            >>> FastAPICache.init(CacheBackendFactory(), prefix="fastapi-cache")
+        """
+
+        settings = ResourceConfig()
+        backend = backend or settings.api_cache_backend
+
+        if backend == 'mongo':
+            return MongoCacheBackend()
+
+        return LRUMemoryBackend(settings.api_cache_max_entries)
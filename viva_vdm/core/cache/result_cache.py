@@ -0,0 +1,144 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from viva_vdm.core.models import LoggerContexts, ResultCacheDBModel
+from viva_vdm.core.settings import ResourceConfig
+
+
+class ResultCache(object):
+    def __init__(
+        self,
+        *,
+        stage: LoggerContexts,
+        method: Optional[str] = None,
+        parameters: Optional[dict] = None,
+        version: Optional[str] = None,
+    ):
+        """
+        A content-addressed cache for the results of a single analysis stage. Results are keyed by a hash of the
+        sequence together with everything else that determines the result, so the same HCS submitted in another job
+        is never analysed twice.
+
+        :param stage: The analysis stage the results belong to.
+        :param method: The prediction method or database used by the stage.
+        :param parameters: Any other parameters that change the result (cutoffs, lengths, alleles, etc.).
+        :param version: The version of the tool, or the release of the database used by the stage.
+
+        :type stage: LoggerContexts
+        :type method: str
+        :type parameters: dict
+        :type version: str
+
+        Example:
+            >>> from viva_vdm.core.cache import ResultCache
+            >>> from viva_vdm.core.models import LoggerContexts
+            >>> cache = ResultCache(stage=LoggerContexts.blast, method='VNR', parameters={'exclude_taxid': 11320})
+            >>> cache.set("MDSNTVSSFQDI", [])
+            >>> cache.get("MDSNTVSSFQDI")
+            []
+        """
+
+        self.settings = ResourceConfig()
+
+        self.stage = stage
+        self.method = method
+        self.parameters = parameters or dict()
+        self.version = version
+
+    def _get_expiry(self) -> datetime:
+        # Mongo expires documents by UTC time.
+        return datetime.utcnow() + timedelta(seconds=self.settings.result_cache_ttl)
+
+    @classmethod
+    def _normalise_sequence(cls, sequence: str) -> str:
+        return ''.join(sequence.split()).upper()
+
+    def make_key(self, sequence: str) -> str:
+        """
+        Generates the content address of a sequence for this stage, method, parameter set and version.
+
+        :param sequence: An amino-acid sequence.
+        :type sequence: str
+
+        :return: A SHA-256 hex digest.
+        """
+
+        content = json.dumps(
+            {
+                'sequence': self._normalise_sequence(sequence),
+                'stage': self.stage.value,
+                'method': self.method,
+                'parameters': self.parameters,
+                'version': self.version,
+            },
+            sort_keys=True,
+            separators=(',', ':'),
+        )
+
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get(self, sequence: str) -> Optional[Any]:
+        """
+        Looks up the cached result of a sequence, and marks it as recently used.
+
+        :param sequence: An amino-acid sequence.
+        :type sequence: str
+
+        :return: The cached result as stored in Mongo, or None if there is no cached result.
+        """
+
+        if not self.settings.result_cache_enabled:
+            return None
+
+        entry = ResultCacheDBModel.objects(id=self.make_key(sequence)).modify(
+            set__accessed_at=datetime.now(), set__expires_at=self._get_expiry(), inc__hits=1
+        )
+
+        return entry.result if entry else None
+
+    def set(self, sequence: str, result: Any):
+        """
+        Caches the result of a sequence, replacing any previous result under the same key.
+
+        :param sequence: An amino-acid sequence.
+        :param result: The result as it should be stored in Mongo (i.e. the output of ``to_mongo``).
+
+        :type sequence: str
+        :type result: Any
+        """
+
+        if not self.settings.result_cache_enabled:
+            return
+
+        now = datetime.now()
+
+        ResultCacheDBModel.objects(id=self.make_key(sequence)).update_one(
+            upsert=True,
+            set__stage=self.stage,
+            set__result=result,
+            set__accessed_at=now,
+            set__expires_at=self._get_expiry(),
+            set_on_insert__created_at=now,
+            set_on_insert__hits=0,
+        )
+
+        self._evict()
+
+    def _evict(self):
+        """
+        Expired entries are removed by the TTL index on ``expires_at``. This additionally bounds the size of the
+        cache by removing the least recently used entries.
+        """
+
+        entries = ResultCacheDBModel._get_collection().estimated_document_count()
+        overflow = entries - self.settings.result_cache_max_entries
+
+        if overflow <= 0:
+            return
+
+        # ``expires_at`` is moved forward with ``accessed_at`` on every read, so the least recently used entries are
+        # the first to expire, and are found through the TTL index rather than by sorting the whole cache.
+        stale_keys = list(ResultCacheDBModel.objects.order_by('expires_at').limit(overflow).scalar('id'))
+        ResultCacheDBModel.objects(id__in=stale_keys).delete()
@@ -1,5 +1,6 @@
 from celery import Celery
-from viva_vdm.core.settings import ResourceConfig
+from celery.signals import worker_init, worker_process_init
+from viva_vdm.core.settings import ResourceConfig, AppConfig
 
 settings = ResourceConfig()
 
@@ -9,13 +10,61 @@ app = Celery(
     'viva_vdm.core.celery_app',
     include=tasks,
     broker=F'amqp://{settings.rabbitmq_username}:{settings.rabbitmq_password}@{settings.rabbitmq_host}:5672',
+    # Chords need a result backend to know when all the stages of a job are done.
+    backend=(
+        f'mongodb://{settings.mongo_ddm_username}:{settings.mongo_ddm_password}@{settings.mongo_host}:27017/'
+        f'{settings.mongo_ddm_database}?authSource={settings.mongo_ddm_database}'
+    ),
+)
+
+app.conf.update(
+    mongodb_backend_settings={'database': settings.mongo_ddm_database, 'taskmeta_collection': 'celery_taskmeta'},
+    task_default_queue=settings.celery_default_queue,
+    # Tasks are only acknowledged once they are done, so a job interrupted by a worker restart is redelivered, and
+    # resumes from the stages that were not completed yet.
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    task_routes={
+        'Prosite': {'queue': settings.celery_cpu_queue},
+        'MHCI': {'queue': settings.celery_cpu_queue},
+        'MHCII': {'queue': settings.celery_cpu_queue},
+        'Blast': {'queue': settings.celery_io_queue},
+    },
 )
 
 app.autodiscover_tasks(['viva_vdm.core.tasks'])
 
 
+def _warm_up_predictors():
+    if not AppConfig().mhcflurry_warm_up:
+        return
+
+    from viva_vdm.core.iedb.mhci.registry import warm_up_predictors
+
+    warm_up_predictors()
+
+
+@worker_process_init.connect
+def warm_up_pool_process(**_):
+    _warm_up_predictors()
+
+
+@worker_init.connect
+def warm_up_solo_worker(sender=None, **_):
+    # A solo worker runs the tasks in its own process, while the pool processes of any other pool are warmed up once
+    # they have been started (models must not be loaded before forking).
+    if 'solo' in str(getattr(sender, 'pool_cls', '')).lower():
+        _warm_up_predictors()
+
+
 def main():
-    worker = app.Worker(include=tasks, pool='solo', loglevel='debug')
+    worker = app.Worker(
+        include=tasks,
+        pool='solo',
+        loglevel='debug',
+        queues=[settings.celery_default_queue, settings.celery_cpu_queue, settings.celery_io_queue],
+    )
     worker.start()
 
 
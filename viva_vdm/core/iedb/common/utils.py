@@ -0,0 +1,28 @@
+from enum import Enum
+from typing import Dict, List, Type
+
+
+def get_allele_supertype_index(supertypes: Type[Enum]) -> Dict[str, List[str]]:
+    """
+    Indexes the pre-defined supertypes by allele, so that predictions made for the union of all alleles can be assigned
+    back to every supertype the allele belongs to.
+
+    :param supertypes: The MHC I or MHC II supertypes, each with the list of its alleles as its value.
+    :type supertypes: Type[Enum]
+
+    :return: A mapping of allele name to the names of the supertypes that contain it.
+
+    Example:
+        >>> from viva_vdm.core.iedb.common.utils import get_allele_supertype_index
+        >>> from viva_vdm.core.iedb.mhci.constants import MhcISupertypes
+        >>> get_allele_supertype_index(MhcISupertypes)['HLA-A*01:01']
+        ['A1']
+    """
+
+    index = dict()
+
+    for supertype in supertypes:
+        for allele in supertype.value:
+            index.setdefault(allele, list()).append(supertype.name)
+
+    return index
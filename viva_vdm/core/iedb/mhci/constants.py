@@ -4,6 +4,8 @@ from pathlib import Path
 from os.path import join
 from typing import List, Literal
 
+from ..common.utils import get_allele_supertype_index
+
 SUPERTYPES_DATA_DIR = join(Path(__file__).parent, "supertypes")
 
 SUPERTYPE_ALLELE_MAP = {
@@ -54,6 +56,9 @@ class MhcISupertypes(Enum):
     B62 = get_alleles("B62")
 
 
+ALLELE_SUPERTYPE_INDEX = get_allele_supertype_index(MhcISupertypes)
+
+
 @dataclass
 class PredictionMethods:
     # TODO: Only NETMHCPAN is in the top 3 of benchmarks. Others either are not in the top 3, or do not produce results.
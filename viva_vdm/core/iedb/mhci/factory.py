@@ -1,4 +1,7 @@
-from .constants import PredictionMethods, MhcISupertypes
+from typing import Any, Dict, Iterable, List
+
+from .constants import PredictionMethods, MhcISupertypes, ALLELE_SUPERTYPE_INDEX
+from .models import MHCIEpitope
 from .wrappers import MhcINetMhcPan, MhcINetMhcPanEL, MhcIPickpocket, MhcFlurry
 
 
@@ -45,3 +48,117 @@ class MhcIPredictionFactory(object):
             return MhcFlurry(**kwargs)
 
         raise NotImplementedError(f'The method {method} is not implemented')
+
+    @classmethod
+    def predict_supertypes(
+        cls,
+        sequences: List[str],
+        *,
+        supertypes: Iterable[MhcISupertypes] = tuple(MhcISupertypes),
+        method: PredictionMethods = PredictionMethods.NETMHCPAN,
+        length: int = 9,
+        cutoff: float = 1.00,
+    ) -> List[Dict[str, List[MHCIEpitope]]]:
+        """
+        Predicts the epitopes of many sequences for all the alleles of many supertypes in one batch. The predictor of
+        every allele is only set up once, even when the allele belongs to more than one supertype.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param supertypes: The pre-defined MHC I supertypes to predict for (default: all of them).
+        :param method: One of the pre-defined MHC I prediction methods (default: NETMHCPAN).
+        :param length: The length of the generated epitopes (default: 9).
+        :param cutoff: The IEDB percentile cutoff (default: 1%).
+
+        :type sequences: List[str]
+        :type supertypes: Iterable[MhcISupertypes]
+        :type method: PredictionMethods
+        :type length: int
+        :type cutoff: float
+
+        :return: For every sequence (in the order of the sequences), a mapping of supertype name to its epitopes.
+
+        Example:
+            >>> from viva_vdm.core.iedb.mhci.constants import MhcISupertypes, PredictionMethods
+            >>> from viva_vdm.core.iedb.mhci.factory import MhcIPredictionFactory
+            >>> results = MhcIPredictionFactory.predict_supertypes(["MDSNTVSSFQDI", "SSVSSFERFEIF"])
+            >>> a1_epitopes_of_first_sequence = results[0]['A1']
+        """
+
+        supertypes = list(supertypes)
+        supertype_names = {supertype.name for supertype in supertypes}
+        alleles = list(dict.fromkeys(allele for supertype in supertypes for allele in supertype.value))
+
+        predictor = cls(supertype=supertypes[0], method=method, length=length, cutoff=cutoff)
+
+        results = [{supertype.name: list() for supertype in supertypes} for _ in sequences]
+
+        # The epitopes are assigned by the allele they were requested for, as the predictor may rename it.
+        for allele, allele_results in predictor.predict_by_allele(sequences, alleles).items():
+            for supertype_name in ALLELE_SUPERTYPE_INDEX[allele]:
+                if supertype_name not in supertype_names:
+                    continue
+
+                for sequence_index, epitopes in enumerate(allele_results):
+                    results[sequence_index][supertype_name].extend(epitopes)
+
+        return results
+
+    @classmethod
+    def predict_supertype_records(
+        cls,
+        sequences: List[str],
+        *,
+        supertypes: Iterable[MhcISupertypes] = tuple(MhcISupertypes),
+        method: PredictionMethods = PredictionMethods.NETMHCPAN,
+        length: int = 9,
+        cutoff: float = 1.00,
+    ) -> List[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Same as ``predict_supertypes``, but the epitopes are returned as plain records ready to be stored. MHCflurry
+        predictions stay in a single DataFrame, from scoring up to the grouping of the records per sequence and
+        supertype, instead of going through an ``MHCIEpitope`` per epitope.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param supertypes: The pre-defined MHC I supertypes to predict for (default: all of them).
+        :param method: One of the pre-defined MHC I prediction methods (default: NETMHCPAN).
+        :param length: The length of the generated epitopes (default: 9).
+        :param cutoff: The IEDB percentile cutoff (default: 1%).
+
+        :type sequences: List[str]
+        :type supertypes: Iterable[MhcISupertypes]
+        :type method: PredictionMethods
+        :type length: int
+        :type cutoff: float
+
+        :return: For every sequence (in the order of the sequences), a mapping of supertype name to the records of its
+            epitopes, each with the ``allele``, ``sequence`` and ``percentile`` of the epitope.
+        """
+
+        supertypes = list(supertypes)
+
+        if method != PredictionMethods.MHCFLURRY:
+            return [
+                {name: [epitope.dict() for epitope in epitopes] for name, epitopes in result.items()}
+                for result in cls.predict_supertypes(
+                    sequences, supertypes=supertypes, method=method, length=length, cutoff=cutoff
+                )
+            ]
+
+        supertype_names = [supertype.name for supertype in supertypes]
+        alleles = list(dict.fromkeys(allele for supertype in supertypes for allele in supertype.value))
+
+        predictor = cls(supertype=supertypes[0], method=method, length=length, cutoff=cutoff)
+        hits = predictor.predict_frame(sequences, alleles)
+
+        # An allele can belong to more than one supertype, so its hits are repeated for every one of them.
+        hits = hits.assign(supertype=hits['allele'].map(ALLELE_SUPERTYPE_INDEX)).explode('supertype')
+        hits = hits[hits['supertype'].isin(supertype_names)]
+
+        results = [{supertype_name: list() for supertype_name in supertype_names} for _ in sequences]
+
+        for (sequence_index, supertype_name), epitopes in hits.groupby(['sequence_index', 'supertype'], sort=False):
+            results[sequence_index][supertype_name] = epitopes[['allele', 'sequence', 'percentile']].to_dict(
+                orient='records'
+            )
+
+        return results
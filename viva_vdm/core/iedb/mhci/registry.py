@@ -0,0 +1,78 @@
+import logging
+import resource
+import threading
+import time
+from typing import Any, Callable, Dict
+
+import mhcflurry
+
+logger = logging.getLogger(__name__)
+
+_predictors: Dict[str, Any] = dict()
+_predictors_lock = threading.Lock()
+
+MHCFLURRY_PRESENTATION = 'mhcflurry_presentation'
+
+
+def _get_peak_memory_mb() -> float:
+    # ``ru_maxrss`` is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def get_predictor(name: str, loader: Callable[[], Any]) -> Any:
+    """
+    Returns the predictor registered under the given name in this process, loading it the first time it is asked for.
+    Loading models is expensive, so every process only does it once, and reports how long it took and how much memory
+    it needed.
+
+    :param name: The name of the predictor in the registry.
+    :param loader: Loads the predictor, only called if the predictor has not been loaded in this process yet.
+
+    :type name: str
+    :type loader: Callable[[], Any]
+
+    :return: The loaded predictor.
+
+    Example:
+        >>> from viva_vdm.core.iedb.mhci.registry import get_predictor
+        >>> predictor = get_predictor('mhcflurry_presentation', mhcflurry.Class1PresentationPredictor.load)
+    """
+
+    predictor = _predictors.get(name)
+
+    if predictor is not None:
+        return predictor
+
+    with _predictors_lock:
+        if name not in _predictors:
+            start_time = time.perf_counter()
+            start_memory = _get_peak_memory_mb()
+
+            _predictors[name] = loader()
+
+            logger.info(
+                'Loaded predictor %s in %.2fs, peak memory %.0fMB (+%.0fMB)',
+                name,
+                time.perf_counter() - start_time,
+                _get_peak_memory_mb(),
+                _get_peak_memory_mb() - start_memory,
+            )
+
+        return _predictors[name]
+
+
+def get_mhcflurry_predictor() -> mhcflurry.Class1PresentationPredictor:
+    """
+    Returns the MHCflurry presentation predictor of this process, so that its model ensemble is only loaded from disk
+    once, instead of for every prediction.
+    """
+
+    return get_predictor(MHCFLURRY_PRESENTATION, mhcflurry.Class1PresentationPredictor.load)
+
+
+def warm_up_predictors():
+    """
+    Loads the predictors ahead of the first prediction, e.g. when a worker process starts.
+    """
+
+    get_mhcflurry_predictor()
@@ -1,11 +1,13 @@
 from viva_vdm.core.iedb.mhci import add_seq_predictor_path  # noqa
 
-import mhcflurry
-from typing import List
+import numpy
+import pandas
+from typing import Dict, List
 from seqpredictor import MHCBindingPredictions
-from util import InputData, OneSequenceInput
+from util import InputData
 from .constants import MhcISupertypes, PredictionMethods
 from .models import MHCIEpitope
+from .registry import get_mhcflurry_predictor
 
 
 class MHCIPredictorBase(object):
@@ -45,53 +47,115 @@ class MHCIPredictorBase(object):
         self.method = method
         self.cutoff = cutoff
 
-    def predict(self, sequence: str):
+    def predict(self, sequence: str) -> List[MHCIEpitope]:
+        """
+        Predicts the epitopes of a single sequence for all the alleles of the supertype.
+
+        :param sequence: A protein sequences to predict epitopes for.
+        :type sequence: str
+
+        :return: A list of epitopes with IEDB percentile ranking that is equal to, or less than the defined cutoff.
+        """
+
+        return self.predict_alleles([sequence], self.supertype.value)[0]
+
+    def predict_many(self, sequences: List[str]) -> List[List[MHCIEpitope]]:
+        """
+        Predicts the epitopes of many sequences for all the alleles of the supertype at once.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :type sequences: List[str]
+
+        :return: A list of epitopes for every sequence, in the order of the sequences.
+        """
+
+        return self.predict_alleles(sequences, self.supertype.value)
+
+    def predict_alleles(self, sequences: List[str], alleles: List[str]) -> List[List[MHCIEpitope]]:
+        """
+        Predicts the epitopes of many sequences for any list of alleles. Each allele's predictor is only set up once
+        for all the sequences, which is what makes batching worthwhile.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param alleles: A list of alleles to predict epitopes for.
+
+        :type sequences: List[str]
+        :type alleles: List[str]
+
+        :return: A list of epitopes for every sequence, in the order of the sequences.
+        """
+
+        results = [list() for _ in sequences]
+
+        for allele_results in self.predict_by_allele(sequences, alleles).values():
+            for sequence_index, epitopes in enumerate(allele_results):
+                results[sequence_index].extend(epitopes)
+
+        return results
+
+    def predict_by_allele(self, sequences: List[str], alleles: List[str]) -> Dict[str, List[List[MHCIEpitope]]]:
+        """
+        Same as ``predict_alleles``, but the epitopes are kept apart per allele, under the allele they were requested
+        for. The allele of an epitope is the name the predictor returns, which may be normalised differently.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param alleles: A list of alleles to predict epitopes for.
+
+        :type sequences: List[str]
+        :type alleles: List[str]
+
+        :return: A mapping of every requested allele to a list of epitopes for every sequence, in the order of the
+            sequences.
+        """
+
         ...
 
 
 class MhcINetMhcPan(MHCIPredictorBase):
-    def predict(self, sequence: str) -> List[MHCIEpitope]:
+    def predict_by_allele(self, sequences: List[str], alleles: List[str]) -> Dict[str, List[List[MHCIEpitope]]]:
         """
         This is the implementation of the prediction method for NetMHCPan.
 
-        :param sequence: A protein sequences to predict epitopes for.
-        :type sequence: str
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param alleles: A list of alleles to predict epitopes for.
 
-        :return: A list of epitopes with IEDB percentile ranking that is equal to, or less than the defined cutoff.
+        :type sequences: List[str]
+        :type alleles: List[str]
+
+        :return: For every requested allele, a list of epitopes with IEDB percentile ranking that is equal to, or less
+            than the defined cutoff for every sequence, in the order of the sequences.
         """
 
-        results = list()
-        input_protein = OneSequenceInput(sequence)
+        results = {allele: [list() for _ in sequences] for allele in alleles}
 
-        for allele in self.supertype.value:
+        for allele in alleles:
+            # The sequences are handed to the predictor directly, so there is no need for an input protein here.
             input_data = InputData(
                 version=self.version,
                 method=self.method,
                 mhc=allele,
                 hla_seq=None,
                 length=self.length,
-                proteins=input_protein,
+                proteins=None,
             )
 
-            predictions = MHCBindingPredictions(input_data).predict(input_data.input_protein.as_amino_acid_text())
+            predictions = MHCBindingPredictions(input_data).predict(sequences)
 
             if not predictions:
                 continue
 
             for allele_predictions in predictions:
-                allele = allele_predictions[1]
-                hits = list()
-
-                for allele_prediction in allele_predictions[2][0]:
-                    if not allele_prediction[3] <= self.cutoff:
-                        continue
-
-                    hits.append(
-                        MHCIEpitope(sequence=allele_prediction[0], percentile=allele_prediction[3], allele=allele)
+                predicted_allele = allele_predictions[1]
+
+                for sequence_index, sequence_predictions in enumerate(allele_predictions[2]):
+                    results[allele][sequence_index].extend(
+                        MHCIEpitope(
+                            sequence=allele_prediction[0], percentile=allele_prediction[3], allele=predicted_allele
+                        )
+                        for allele_prediction in sequence_predictions
+                        if allele_prediction[3] <= self.cutoff
                     )
 
-                results.extend(hits)
-
         return results
 
 
@@ -100,60 +164,124 @@ class MhcINetMhcPanEL(MhcINetMhcPan):
 
 
 class MhcIPickpocket(MHCIPredictorBase):
-    def predict(self, sequence: str) -> List[MHCIEpitope]:
+    def predict_by_allele(self, sequences: List[str], alleles: List[str]) -> Dict[str, List[List[MHCIEpitope]]]:
         """
         This is the implementation of the prediction method for Pickpocket.
 
-        :param sequence: A protein sequences to predict epitopes for.
-        :type sequence: str
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param alleles: A list of alleles to predict epitopes for.
 
-        :return: A list of epitopes with IEDB percentile ranking that is equal to, or less than the defined cutoff.
+        :type sequences: List[str]
+        :type alleles: List[str]
+
+        :return: For every requested allele, a list of epitopes with IEDB percentile ranking that is equal to, or less
+            than the defined cutoff for every sequence, in the order of the sequences.
         """
 
-        results = list()
-        input_protein = OneSequenceInput(sequence)
+        results = {allele: [list() for _ in sequences] for allele in alleles}
 
-        for allele in self.supertype.value:
+        for allele in alleles:
             input_data = InputData(
                 version=self.version,
-                method=self.method.value,
+                method=self.method,
                 mhc=allele,
                 hla_seq=None,
                 length=self.length,
-                proteins=input_protein,
+                proteins=None,
             )
 
-            predictions = MHCBindingPredictions(input_data).predict(input_data.input_protein.as_amino_acid_text())
-            predictions = [
-                MHCIEpitope(sequence=sequence[pos : pos + self.length], percentile=hit[1])  # noqa: E203
-                for pos, hit in enumerate(predictions[0][2][0])
-                if hit[1] <= self.cutoff
-            ]
-            results.extend(predictions)
+            predictions = MHCBindingPredictions(input_data).predict(sequences)
+
+            for sequence_index, sequence_predictions in enumerate(predictions[0][2]):
+                sequence = sequences[sequence_index]
+
+                results[allele][sequence_index].extend(
+                    MHCIEpitope(
+                        sequence=sequence[pos : pos + self.length], percentile=hit[1], allele=allele  # noqa: E203
+                    )
+                    for pos, hit in enumerate(sequence_predictions)
+                    if hit[1] <= self.cutoff
+                )
 
         return results
 
 
 class MhcFlurry(MHCIPredictorBase):
-    def predict(self, sequence: str) -> List[MHCIEpitope]:
+    # The default peptide lengths of MHCflurry's predict_sequences. MHCflurry predictions score all of them, whatever
+    # the length asked for the IEDB methods.
+    PEPTIDE_LENGTHS = (8, 9, 10, 11)
+
+    def predict_frame(self, sequences: List[str], alleles: List[str]) -> pandas.DataFrame:
+        """
+        Scores every peptide (of every length in ``PEPTIDE_LENGTHS``) of every sequence against every allele with a
+        single vectorised call of the MHCflurry affinity predictor. Peptides shared by several sequences are only
+        scored once.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param alleles: A list of alleles to predict epitopes for.
+
+        :type sequences: List[str]
+        :type alleles: List[str]
+
+        :return: The epitopes with a percentile ranking that is equal to, or less than the defined cutoff, with the
+            columns ``sequence_index`` (the index of the sequence the epitope was found in), ``sequence``, ``allele``
+            and ``percentile``.
+        """
+
+        columns = ['sequence_index', 'sequence', 'allele', 'percentile']
+
+        sequence_peptides = pandas.DataFrame(
+            [
+                (sequence_index, sequence[start : start + length])  # noqa: E203
+                for sequence_index, sequence in enumerate(sequences)
+                for length in self.PEPTIDE_LENGTHS
+                for start in range(len(sequence) - length + 1)
+            ],
+            columns=['sequence_index', 'sequence'],
+        )
+
+        if sequence_peptides.empty or not alleles:
+            return pandas.DataFrame(columns=columns)
+
+        peptides = sequence_peptides['sequence'].unique()
+
+        predictions = get_mhcflurry_predictor().affinity_predictor.predict_to_dataframe(
+            peptides=numpy.repeat(peptides, len(alleles)),
+            alleles=numpy.tile(alleles, len(peptides)),
+            throw=False,
+            include_confidence_intervals=False,
+        )
+
+        # The predictions are in the order of the inputs, so they are kept under the alleles they were requested for.
+        predictions = predictions.assign(allele=numpy.tile(alleles, len(peptides)))
+
+        # Unsupported alleles or peptides have no percentile, and are dropped along with the ones above the cutoff.
+        hits = predictions.loc[predictions['prediction_percentile'] <= self.cutoff, ['peptide', 'allele']].assign(
+            percentile=predictions['prediction_percentile']
+        )
+
+        return sequence_peptides.merge(hits.rename(columns={'peptide': 'sequence'}), on='sequence')[columns]
+
+    def predict_by_allele(self, sequences: List[str], alleles: List[str]) -> Dict[str, List[List[MHCIEpitope]]]:
         """
         This is the implementation of the prediction method for Mhcflurry. This is not part of IEDB.
         https://github.com/openvax/mhcflurry
 
-        :param sequence: A protein sequences to predict epitopes for.
-        :type sequence: str
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param alleles: A list of alleles to predict epitopes for.
 
-        :return: A list of epitopes with IEDB percentile ranking that is equal to, or less than the defined cutoff.
+        :type sequences: List[str]
+        :type alleles: List[str]
+
+        :return: For every requested allele, a list of epitopes with IEDB percentile ranking that is equal to, or less
+            than the defined cutoff for every sequence, in the order of the sequences.
         """
 
-        predictor = mhcflurry.Class1PresentationPredictor.load()
+        results = {allele: [list() for _ in sequences] for allele in alleles}
 
-        results = predictor.predict_sequences(
-            sequences=sequence,
-            alleles=self.supertype.value,
-            result="filtered",
-            comparison_quantity="affinity_percentile",
-            filter_value=self.cutoff,
-        ).to_dict(orient="records")
+        for hit in self.predict_frame(sequences, alleles).itertuples(index=False):
+            results[hit.allele][hit.sequence_index].append(
+                MHCIEpitope(sequence=hit.sequence, percentile=hit.percentile, allele=hit.allele)
+            )
 
-        return [MHCIEpitope(sequence=hit.get("peptide"), percentile=hit.get("affinity_percentile")) for hit in results]
+        return results
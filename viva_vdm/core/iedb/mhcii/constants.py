@@ -4,6 +4,8 @@ from pathlib import Path
 from os.path import join
 from typing import List, Literal
 
+from ..common.utils import get_allele_supertype_index
+
 SUPERTYPES_DATA_DIR = join(Path(__file__).parent, "supertypes")
 
 SUPERTYPE_ALLELE_MAP = {
@@ -34,6 +36,9 @@ class MhcIISupertypes(Enum):
     DQ = get_alleles("DQ")
 
 
+ALLELE_SUPERTYPE_INDEX = get_allele_supertype_index(MhcIISupertypes)
+
+
 @dataclass
 class PredictionMethods:
     # CONSENSUS = "consensus" doesn't work
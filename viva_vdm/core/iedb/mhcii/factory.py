@@ -1,4 +1,7 @@
-from viva_vdm.core.iedb.mhcii.constants import PredictionMethods, MhcIISupertypes
+from typing import Dict, Iterable, List
+
+from viva_vdm.core.iedb.mhcii.constants import PredictionMethods, MhcIISupertypes, ALLELE_SUPERTYPE_INDEX
+from viva_vdm.core.iedb.mhcii.models import MHCIIEpitope
 from viva_vdm.core.iedb.mhcii.wrappers import MhcIINetMhcPan
 
 
@@ -39,3 +42,56 @@ class MhcIIPredictionFactory(object):
             return MhcIINetMhcPan(**kwargs)
 
         raise NotImplementedError(f'The method {method} is not implemented')
+
+    @classmethod
+    def predict_supertypes(
+        cls,
+        sequences: List[str],
+        *,
+        supertypes: Iterable[MhcIISupertypes] = tuple(MhcIISupertypes),
+        method: PredictionMethods = PredictionMethods.NETMHCIIPAN,
+        length: int = 12,
+        cutoff: float = 1.00,
+    ) -> List[Dict[str, List[MHCIIEpitope]]]:
+        """
+        Predicts the epitopes of many sequences for all the alleles of many supertypes in a single predictor
+        invocation, and splits the results back per sequence and supertype.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param supertypes: The pre-defined MHC II supertypes to predict for (default: all of them).
+        :param method: One of the pre-defined MHC II prediction methods (default: NETMHCIIPAN).
+        :param length: The length of the generated epitopes (default: 12).
+        :param cutoff: The IEDB percentile cutoff (default: 1%).
+
+        :type sequences: List[str]
+        :type supertypes: Iterable[MhcIISupertypes]
+        :type method: PredictionMethods
+        :type length: int
+        :type cutoff: float
+
+        :return: For every sequence (in the order of the sequences), a mapping of supertype name to its epitopes.
+
+        Example:
+            >>> from viva_vdm.core.iedb.mhcii.factory import MhcIIPredictionFactory
+            >>> results = MhcIIPredictionFactory.predict_supertypes(["MDSNTVSSFQDIL", "SSVSSFERFEIFP"])
+            >>> dr_epitopes_of_first_sequence = results[0]['DR']
+        """
+
+        supertypes = list(supertypes)
+        supertype_names = {supertype.name for supertype in supertypes}
+        alleles = list(dict.fromkeys(allele for supertype in supertypes for allele in supertype.value))
+
+        predictor = cls(supertype=supertypes[0], method=method, length=length, cutoff=cutoff)
+
+        results = [{supertype.name: list() for supertype in supertypes} for _ in sequences]
+
+        # The epitopes are assigned by the allele they were requested for, as the predictor may rename it.
+        for allele, allele_results in predictor.predict_by_allele(sequences, alleles).items():
+            for supertype_name in ALLELE_SUPERTYPE_INDEX[allele]:
+                if supertype_name not in supertype_names:
+                    continue
+
+                for sequence_index, epitopes in enumerate(allele_results):
+                    results[sequence_index][supertype_name].extend(epitopes)
+
+        return results
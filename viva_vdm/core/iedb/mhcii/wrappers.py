@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from mhcii_predictor import MhciiPredictor
 from .constants import MhcIISupertypes, PredictionMethods
@@ -42,14 +42,9 @@ class MHCIIPredictorBase(object):
         self.method = method
         self.cutoff = cutoff
 
-    def predict(self, sequence: str):
-        ...
-
-
-class MhcIINetMhcPan(MHCIIPredictorBase):
     def predict(self, sequence: str) -> List[MHCIIEpitope]:
         """
-        This is the implementation of the prediction method for NetMHCPan.
+        Predicts the epitopes of a single sequence for all the alleles of the supertype.
 
         :param sequence: A protein sequences to predict epitopes for.
         :type sequence: str
@@ -57,18 +52,93 @@ class MhcIINetMhcPan(MHCIIPredictorBase):
         :return: A list of epitopes with IEDB percentile ranking that is equal to, or less than the defined cutoff.
         """
 
-        allele_count = len(self.supertype.value)
-        results = list()
+        return self.predict_alleles([sequence], self.supertype.value)[0]
+
+    def predict_many(self, sequences: List[str]) -> List[List[MHCIIEpitope]]:
+        """
+        Predicts the epitopes of many sequences for all the alleles of the supertype at once.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :type sequences: List[str]
+
+        :return: A list of epitopes for every sequence, in the order of the sequences.
+        """
+
+        return self.predict_alleles(sequences, self.supertype.value)
+
+    def predict_alleles(self, sequences: List[str], alleles: List[str]) -> List[List[MHCIIEpitope]]:
+        """
+        Predicts the epitopes of many sequences for any list of alleles in a single predictor invocation.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param alleles: A list of alleles to predict epitopes for.
+
+        :type sequences: List[str]
+        :type alleles: List[str]
+
+        :return: A list of epitopes for every sequence, in the order of the sequences.
+        """
+
+        results = [list() for _ in sequences]
+
+        for allele_results in self.predict_by_allele(sequences, alleles).values():
+            for sequence_index, epitopes in enumerate(allele_results):
+                results[sequence_index].extend(epitopes)
+
+        return results
+
+    def predict_by_allele(self, sequences: List[str], alleles: List[str]) -> Dict[str, List[List[MHCIIEpitope]]]:
+        """
+        Same as ``predict_alleles``, but the epitopes are kept apart per allele, under the allele they were requested
+        for. The allele of an epitope is the name the predictor returns, which may be normalised differently.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param alleles: A list of alleles to predict epitopes for.
+
+        :type sequences: List[str]
+        :type alleles: List[str]
+
+        :return: A mapping of every requested allele to a list of epitopes for every sequence, in the order of the
+            sequences.
+        """
+
+        ...
+
+
+class MhcIINetMhcPan(MHCIIPredictorBase):
+    def predict_by_allele(self, sequences: List[str], alleles: List[str]) -> Dict[str, List[List[MHCIIEpitope]]]:
+        """
+        This is the implementation of the prediction method for NetMHCPan. All the sequences and alleles are sent to
+        the predictor at once, so that NetMHCIIpan is only started once.
+
+        :param sequences: A list of protein sequences to predict epitopes for.
+        :param alleles: A list of alleles to predict epitopes for.
+
+        :type sequences: List[str]
+        :type alleles: List[str]
+
+        :return: For every requested allele, a list of epitopes with IEDB percentile ranking that is equal to, or less
+            than the defined cutoff for every sequence, in the order of the sequences.
+        """
+
+        results = {allele: [list() for _ in sequences] for allele in alleles}
+
+        predictions = MhciiPredictor(self.method, alleles, [self.length] * len(alleles)).predict(sequences)
 
-        predictions = MhciiPredictor(self.method, self.supertype.value, [self.length] * allele_count).predict(
-            [sequence]
-        )
+        # The predictions are in the order of the requested alleles, which is the only reliable way to match them, as
+        # the predictor may return the alleles under other names.
+        if len(predictions) != len(alleles):
+            raise ValueError(f'Expected predictions for {len(alleles)} alleles, got {len(predictions)}')
 
-        for allele in predictions:
-            allele_name = allele[1]
+        for allele, allele_predictions in zip(alleles, predictions):
+            allele_name = allele_predictions[1]
 
-            for epitope in allele[2][0]:
-                if epitope[2] <= self.cutoff:
-                    results.append(MHCIIEpitope(sequence=epitope[0], percentile=epitope[2], allele=allele_name))
+            # The predictions of every allele hold one list of epitopes per sequence, in the order of the sequences.
+            for sequence_index, sequence_predictions in enumerate(allele_predictions[2]):
+                for epitope in sequence_predictions:
+                    if epitope[2] <= self.cutoff:
+                        results[allele][sequence_index].append(
+                            MHCIIEpitope(sequence=epitope[0], percentile=epitope[2], allele=allele_name)
+                        )
 
         return results
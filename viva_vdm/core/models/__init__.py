@@ -9,4 +9,6 @@ from .models import (
     LoggerMessages,
     BlastDBModel,
     PrositeDBModel,
+    ResultCacheDBModel,
+    ApiCacheDBModel,
 )
@@ -0,0 +1,371 @@
+import asyncio
+import functools
+import itertools
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.cursor import Cursor
+from pymongo.database import Database
+
+from .models import ApiCacheDBModel, HCSDBModel, JobDBModel, JobStatuses, LoggerContexts, LoggerFlags
+from ..settings import ResourceConfig
+
+_client: Optional[MongoClient] = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_database() -> Database:
+    """
+    Returns the database of the async reads of this process, connecting the first time it is asked for. The reads
+    share their own bounded pool of connections, and run on their own executor of the same size (as Motor does), so
+    the read endpoints never block the event loop, nor compete with the sync endpoints for the threadpool.
+
+    Example:
+        >>> from viva_vdm.core.models.aio import get_database
+        >>> database = get_database()
+    """
+
+    global _client, _executor
+
+    settings = ResourceConfig()
+
+    if _client is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.mongo_async_max_pool_size, thread_name_prefix='mongo-async')
+        _client = MongoClient(
+            host=settings.mongo_host,
+            port=27017,
+            username=settings.mongo_ddm_username,
+            password=settings.mongo_ddm_password,
+            authSource=settings.mongo_ddm_database,
+            maxPoolSize=settings.mongo_async_max_pool_size,
+            minPoolSize=settings.mongo_async_min_pool_size,
+            maxIdleTimeMS=settings.mongo_async_max_idle_time_ms,
+            waitQueueTimeoutMS=settings.mongo_async_wait_queue_timeout_ms,
+        )
+
+    return _client[settings.mongo_ddm_database]
+
+
+def close_database():
+    """
+    Closes the connections of the async reads of this process, e.g. when the API shuts down.
+    """
+
+    global _client, _executor
+
+    if _client is not None:
+        _executor.shutdown(wait=True)
+        _client.close()
+        _client, _executor = None, None
+
+
+async def _run(fn: Callable, *args, **kwargs) -> Any:
+    database = get_database()
+
+    return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(fn, database, *args, **kwargs))
+
+
+def _get_page(rows: List[dict], limit: Optional[int], cursor_field: str) -> Tuple[List[dict], Optional[Any]]:
+    if limit is None:
+        return rows, None
+
+    # One more row than the limit is always fetched, to know whether there is a next page.
+    next_cursor = rows[limit - 1][cursor_field] if len(rows) > limit else None
+
+    return rows[:limit], next_cursor
+
+
+async def get_job_status(job_id: str) -> Optional[JobStatuses]:
+    """
+    Gets the status of a job, reading nothing else from the job.
+
+    :param job_id: The ID of the job.
+    :type job_id: str
+
+    :return: The status of the job, or None if the job does not exist.
+    """
+
+    def find_job(database: Database) -> Optional[dict]:
+        return database[JobDBModel._get_collection_name()].find_one({'_id': job_id}, {'_id': 0, 'status': 1})
+
+    job = await _run(find_job)
+
+    if job is None:
+        return None
+
+    return JobStatuses(job.get('status', JobStatuses.pending.value))
+
+
+async def get_job_hcs_page(
+    job_id: str,
+    *,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = 100,
+    fields: Optional[List[str]] = None,
+) -> Optional[Tuple[List[dict], Optional[str]]]:
+    """
+    Gets a page of the HCS of a job, in the order they were created. Only the HCS references are read from the job,
+    and the HCS of the page are then fetched with a single ``$in`` query.
+
+    :param job_id: The ID of the job.
+    :param cursor: Only HCS created after the HCS with this ID are returned (the cursor of the previous page).
+    :param limit: The maximum number of HCS in the page (None for all of them).
+    :param fields: Only these fields of every HCS are returned (default: all of them).
+
+    :type job_id: str
+    :type cursor: str
+    :type limit: int
+    :type fields: List[str]
+
+    :return: The HCS of the page as raw documents, and the cursor of the next page (None on the last page), or None if
+        the job does not exist.
+    """
+
+    def find_hcs(database: Database) -> Optional[List[dict]]:
+        job = database[JobDBModel._get_collection_name()].find_one({'_id': job_id}, {'_id': 0, 'hcs': 1})
+
+        if job is None:
+            return None
+
+        query = {'_id': {'$in': job.get('hcs', list())}}
+
+        if cursor:
+            query['_id']['$gt'] = ObjectId(cursor)
+
+        projection = {field: 1 for field in fields} if fields else None
+
+        hcs_cursor = database[HCSDBModel._get_collection_name()].find(query, projection).sort('_id', 1)
+
+        return list(hcs_cursor.limit(limit + 1) if limit is not None else hcs_cursor)
+
+    rows = await _run(find_hcs)
+
+    if rows is None:
+        return None
+
+    hcs_list, next_cursor = _get_page(rows, limit, '_id')
+
+    return hcs_list, str(next_cursor) if next_cursor else None
+
+
+async def get_job_hcs_ids(job_id: str) -> Optional[List[ObjectId]]:
+    """
+    Gets the IDs of the HCS of a job, in the order they were submitted.
+
+    :param job_id: The ID of the job.
+    :type job_id: str
+
+    :return: The IDs of the HCS of the job, or None if the job does not exist.
+    """
+
+    def find_job(database: Database) -> Optional[dict]:
+        return database[JobDBModel._get_collection_name()].find_one({'_id': job_id}, {'_id': 0, 'hcs': 1})
+
+    job = await _run(find_job)
+
+    if job is None:
+        return None
+
+    return job.get('hcs', list())
+
+
+async def iter_hcs_batches(
+    hcs_ids: List[ObjectId], *, fields: Optional[List[str]] = None, batch_size: int = 100
+) -> AsyncIterator[List[dict]]:
+    """
+    Reads many HCS through a single cursor, in the order they were created, and yields them in batches as raw
+    documents, so that not all of them have to be held in memory at once.
+
+    :param hcs_ids: The IDs of the HCS.
+    :param fields: Only these fields of every HCS are read (default: all of them).
+    :param batch_size: The number of HCS per batch, and per round-trip to Mongo.
+
+    :type hcs_ids: List[ObjectId]
+    :type fields: List[str]
+    :type batch_size: int
+
+    :return: The HCS, in batches of up to ``batch_size``.
+    """
+
+    def open_cursor(database: Database) -> Cursor:
+        return (
+            database[HCSDBModel._get_collection_name()]
+            .find({'_id': {'$in': hcs_ids}}, {field: 1 for field in fields} if fields else None)
+            .sort('_id', 1)
+            .batch_size(batch_size)
+        )
+
+    def read_batch(_: Database, cursor: Cursor) -> List[dict]:
+        return list(itertools.islice(cursor, batch_size))
+
+    cursor = await _run(open_cursor)
+
+    try:
+        while True:
+            batch = await _run(read_batch, cursor)
+
+            if not batch:
+                return
+
+            yield batch
+    finally:
+        cursor.close()
+
+
+async def get_job_log_page(
+    job_id: str,
+    *,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = 100,
+    contexts: Optional[List[LoggerContexts]] = None,
+    flags: Optional[List[LoggerFlags]] = None,
+    since: Optional[datetime] = None,
+) -> Optional[Tuple[List[dict], Optional[int]]]:
+    """
+    Gets a page of the log entries of a job, filtered on the server, without loading the rest of the job. Log entries
+    are only ever appended, so the position of an entry in the log is a stable cursor.
+
+    :param job_id: The ID of the job.
+    :param cursor: Only entries after this position in the log are returned (the cursor of the previous page).
+    :param limit: The maximum number of entries in the page (None for all of them).
+    :param contexts: Only entries of these contexts are returned.
+    :param flags: Only entries with these flags are returned.
+    :param since: Only entries logged after this time are returned.
+
+    :type job_id: str
+    :type cursor: int
+    :type limit: int
+    :type contexts: List[LoggerContexts]
+    :type flags: List[LoggerFlags]
+    :type since: datetime
+
+    :return: The log entries of the page as raw documents, and the cursor of the next page (None on the last page), or
+        None if the job does not exist.
+    """
+
+    job_match = {'_id': job_id}
+    entry_match = dict()
+
+    if cursor is not None:
+        entry_match['index'] = {'$gt': cursor}
+    if contexts:
+        entry_match['logs.context'] = {'$in': [context.value for context in contexts]}
+    if flags:
+        entry_match['logs.flag'] = {'$in': [flag.value for flag in flags]}
+    if since:
+        # Jobs without newer entries are left out before their logs are unwound.
+        job_match['logs.timestamp'] = entry_match['logs.timestamp'] = {'$gt': since}
+
+    def find_logs(database: Database) -> Optional[List[dict]]:
+        collection = database[JobDBModel._get_collection_name()]
+
+        if collection.find_one({'_id': job_id}, {'_id': 1}) is None:
+            return None
+
+        pipeline = [
+            {'$match': job_match},
+            {'$project': {'_id': 0, 'logs': 1}},
+            {'$unwind': {'path': '$logs', 'includeArrayIndex': 'index'}},
+            {'$match': entry_match},
+        ]
+
+        if limit is not None:
+            pipeline.append({'$limit': limit + 1})
+
+        return list(collection.aggregate(pipeline))
+
+    rows = await _run(find_logs)
+
+    if rows is None:
+        return None
+
+    rows, next_cursor = _get_page(rows, limit, 'index')
+
+    return [row['logs'] for row in rows], next_cursor
+
+
+async def get_hcs_results(hcs_id: str) -> Optional[dict]:
+    """
+    Gets the results of a HCS, reading nothing else from the HCS.
+
+    :param hcs_id: The ID of the HCS.
+    :type hcs_id: str
+
+    :return: The results of the HCS as a raw document, or None if the HCS does not exist.
+    """
+
+    if not ObjectId.is_valid(hcs_id):
+        return None
+
+    def find_hcs(database: Database) -> Optional[dict]:
+        return database[HCSDBModel._get_collection_name()].find_one({'_id': ObjectId(hcs_id)}, {'_id': 0, 'results': 1})
+
+    hcs = await _run(find_hcs)
+
+    if hcs is None:
+        return None
+
+    return hcs.get('results', dict())
+
+
+async def get_api_cache_entry(key: str) -> Optional[dict]:
+    """
+    Gets an entry of the shared response cache of the API.
+
+    :param key: The key of the entry.
+    :type key: str
+
+    :return: The value of the entry, and when it expires, or None if there is no such entry.
+    """
+
+    def find_entry(database: Database) -> Optional[dict]:
+        return database[ApiCacheDBModel._get_collection_name()].find_one({'_id': key}, {'_id': 0})
+
+    return await _run(find_entry)
+
+
+async def set_api_cache_entry(key: str, value: str, expires_at: datetime):
+    """
+    Sets an entry of the shared response cache of the API.
+
+    :param key: The key of the entry.
+    :param value: The value of the entry.
+    :param expires_at: When the entry expires (UTC).
+
+    :type key: str
+    :type value: str
+    :type expires_at: datetime
+    """
+
+    def upsert_entry(database: Database):
+        database[ApiCacheDBModel._get_collection_name()].replace_one(
+            {'_id': key}, {'value': value, 'expires_at': expires_at}, upsert=True
+        )
+
+    await _run(upsert_entry)
+
+
+async def clear_api_cache_entries(namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+    """
+    Removes the entries of the shared response cache of the API whose key starts with the namespace, or the entry
+    with the key.
+
+    :param namespace: The prefix of the keys of the entries to remove.
+    :param key: The key of the entry to remove, if there is no namespace.
+
+    :type namespace: str
+    :type key: str
+
+    :return: The number of entries removed.
+    """
+
+    query = {'_id': {'$regex': f'^{re.escape(namespace)}'}} if namespace else {'_id': key}
+
+    def delete_entries(database: Database) -> int:
+        return database[ApiCacheDBModel._get_collection_name()].delete_many(query).deleted_count
+
+    return await _run(delete_entries)
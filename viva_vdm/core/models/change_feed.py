@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Set
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from .aio import get_database
+from .models import JobDBModel
+
+logger = logging.getLogger(__name__)
+
+
+class JobChangeFeed(object):
+    RETRY_DELAY = 5.0
+
+    def __init__(self):
+        """
+        Fans the changes of the jobs out to the coroutines waiting for them. The process opens a single Mongo change
+        stream on the job collection, however many coroutines wait, and wakes up the waiters of a job whenever it is
+        updated (e.g. its status is set, or an entry is pushed to its log).
+
+        Change streams need a replica set, ``available`` is False whenever the stream cannot be opened, and waiters
+        should then fall back to polling.
+
+        Example:
+            >>> from viva_vdm.core.models.change_feed import job_change_feed
+            >>> async def wait_for_change(job_id: str):
+            ...     changed = job_change_feed.subscribe(job_id)
+            ...     await asyncio.wait_for(changed.wait(), timeout=15)
+        """
+
+        self.available = False
+
+        self._subscribers: Dict[str, Set[asyncio.Event]] = dict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """
+        Starts watching the job collection, on a thread of its own, for the running event loop.
+        """
+
+        if self._thread is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._watch, name='job-change-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops watching the job collection.
+        """
+
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.available = False
+
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        """
+        Subscribes to the changes of a job.
+
+        :param job_id: The ID of the job.
+        :type job_id: str
+
+        :return: An event that is set whenever the job changes. Clear it before reading the job, so that no change is
+            missed.
+        """
+
+        event = asyncio.Event()
+        self._subscribers.setdefault(job_id, set()).add(event)
+
+        return event
+
+    def unsubscribe(self, job_id: str, event: asyncio.Event):
+        """
+        Unsubscribes from the changes of a job.
+
+        :param job_id: The ID of the job.
+        :param event: The event returned by ``subscribe``.
+
+        :type job_id: str
+        :type event: asyncio.Event
+        """
+
+        events = self._subscribers.get(job_id, set())
+        events.discard(event)
+
+        if not events:
+            self._subscribers.pop(job_id, None)
+
+    def _notify(self, job_id: str):
+        for event in self._subscribers.get(job_id, set()):
+            event.set()
+
+    def _watch(self):
+        collection = get_database()[JobDBModel._get_collection_name()]
+        pipeline = [
+            {'$match': {'operationType': {'$in': ['update', 'replace']}}},
+            {'$project': {'documentKey': 1}},
+        ]
+
+        while not self._stopped.is_set():
+            try:
+                with collection.watch(pipeline, max_await_time_ms=1000) as stream:
+                    self.available = True
+
+                    while not self._stopped.is_set():
+                        change = stream.try_next()
+
+                        if change is not None:
+                            self._loop.call_soon_threadsafe(self._notify, change['documentKey']['_id'])
+            except OperationFailure as ex:
+                logger.warning('Job change streams are not supported, falling back to polling: %s', ex)
+                self.available = False
+
+                return
+            except PyMongoError as ex:
+                logger.warning('Job change stream failed, retrying in %ss: %s', self.RETRY_DELAY, ex)
+                self.available = False
+
+                self._stopped.wait(self.RETRY_DELAY)
+
+
+job_change_feed = JobChangeFeed()
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Any, List, Optional, Tuple, Union
 from uuid import uuid4
 
 from mongoengine import (
@@ -17,8 +17,10 @@ from mongoengine import (
     FloatField,
     UUIDField,
     IntField,
+    DynamicField,
 )
 from mongoengine_goodjson import Document, FollowReferenceField
+from pymongo import UpdateOne
 
 from ..settings import ResourceConfig
 
@@ -141,35 +143,89 @@ class JobDBModel:
     ...
 
 
+class HCSDBModel:
+    ...
+
+
 class LoggerQuerySet(QuerySet):
     def update_log(
         self,
         *,
         context: LoggerContexts,
         flag: LoggerFlags,
-        msg: LoggerMessages,
+        msg: Union[LoggerMessages, str],
         instance: Optional[JobDBModel] = None,
         pk: Optional[str] = None,
     ):
         if not instance and not pk:
             raise ValueError('Either an instance, or a pk needed')
 
-        entry = LogEntryDBModel(flag=flag, message=msg, context=context)
-        job = instance or self.get(id=pk)
-
-        job.logs.append(entry)
-        job.save()
+        # Error messages are formatted with the error, so they are no longer members of LoggerMessages.
+        entry = LogEntryDBModel(
+            flag=flag, message=msg.value if isinstance(msg, LoggerMessages) else msg, context=context
+        )
 
-        return job
+        # Stages of the same job may log from different workers at once, so the entry is pushed atomically instead of
+        # saving the (possibly stale) list held by this process.
+        self.filter(id=instance.id if instance else pk).update_one(push__logs=entry)
 
     def update_status(self, *, status: JobStatuses, instance: Optional[JobDBModel] = None, pk: Optional[str] = None):
         if not instance and not pk:
             raise ValueError('Either an instance, or a pk needed')
 
-        job = instance or self.get(id=pk)
+        # Only the status is written, rather than re-serialising the whole job (logs and HCS references included).
+        self.filter(id=instance.id if instance else pk).update_one(set__status=status)
+
+        if instance:
+            instance.status = status
+
+
+class HCSQuerySet(QuerySet):
+    def insert_many(self, hcs_list: List[HCSDBModel]) -> List[HCSDBModel]:
+        """
+        Validates and inserts many new HCS with a single round-trip, setting the id of every HCS.
+        """
+
+        if not hcs_list:
+            return hcs_list
+
+        for hcs in hcs_list:
+            hcs.validate()
+
+        self.insert(hcs_list, load_bulk=False)
+
+        return hcs_list
+
+    def save_stage_results(self, *, context: LoggerContexts, results: List[Tuple[HCSDBModel, Any]]):
+        """
+        Persists the results of a stage for many HCS with a single bulk write. Every HCS gets a targeted update of the
+        field of the stage, which also marks the stage as completed, so the rest of the document is never rewritten.
+        The results are validated against the field of the stage first, as the updates of the queryset would.
+
+        :param context: The stage that was run.
+        :param results: Every HCS, and the value of the ``HCSResultsDBModel`` field of the stage for it.
+        """
 
-        job.status = status
-        job.save()
+        if not results:
+            return
+
+        field = HCSResultsDBModel._fields[context.value]
+        updates = list()
+
+        for hcs, result in results:
+            field.validate(result)
+
+            updates.append(
+                UpdateOne(
+                    {'_id': hcs.id},
+                    {
+                        '$set': {f'results.{field.db_field}': field.to_mongo(result)},
+                        '$addToSet': {'completed_stages': context.value},
+                    },
+                )
+            )
+
+        self._collection.bulk_write(updates, ordered=False)
 
 
 class LogEntryDBModel(EmbeddedDocument):
@@ -177,7 +233,7 @@ class LogEntryDBModel(EmbeddedDocument):
     flag = EnumField(LoggerFlags, required=True)
     context = EnumField(LoggerContexts, required=True)
     timestamp = DateTimeField(required=True, default=datetime.now)
-    message = EnumField(LoggerMessages, required=True)
+    message = StringField(required=True)
 
     meta = {'collection': 'logs'}
 
@@ -236,8 +292,10 @@ class HCSDBModel(Document):
     incidence = FloatField(required=True)
     position = IntField(required=True)
     results = EmbeddedDocumentField(HCSResultsDBModel, required=True, default=HCSResultsDBModel())
+    # The stages whose results have been persisted, so that retried or redelivered tasks can skip them.
+    completed_stages = ListField(StringField(choices=[context.value for context in LoggerContexts]), default=list)
 
-    meta = {'collection': 'hcs'}
+    meta = {'collection': 'hcs', 'queryset_class': HCSQuerySet}
 
 
 class JobDBModel(Document):
@@ -250,4 +308,45 @@ class JobDBModel(Document):
     mhci_prediction_method = EnumField(MHCIPredictionMethods, default=MHCIPredictionMethods.NETMHCPAN)
     mhcii_prediction_method = EnumField(MHCIIPredictionMethods, default=MHCIIPredictionMethods.NETMHCIIPAN)
 
-    meta = {'collection': 'job', 'queryset_class': LoggerQuerySet}
+    meta = {
+        'collection': 'job',
+        'queryset_class': LoggerQuerySet,
+    }
+
+
+class ResultCacheDBModel(Document):
+    """
+    A content-addressed cache of analysis results. The id is a hash of everything that determines the result of a stage
+    (see ``viva_vdm.core.cache.ResultCache``), and ``result`` holds the value of the matching ``HCSResultsDBModel``
+    field as it is stored in Mongo.
+    """
+
+    id = StringField(required=True, primary_key=True)
+    stage = EnumField(LoggerContexts, required=True)
+    result = DynamicField(required=True)
+    hits = IntField(default=0)
+    created_at = DateTimeField(required=True, default=datetime.now)
+    accessed_at = DateTimeField(required=True, default=datetime.now)
+    # Moved forward on every read, so the TTL setting can change without changing the TTL index.
+    expires_at = DateTimeField(required=True)
+
+    meta = {
+        'collection': 'result_cache',
+        'indexes': [{'fields': ['expires_at'], 'expireAfterSeconds': 0}],
+    }
+
+
+class ApiCacheDBModel(Document):
+    """
+    The shared response cache of the API (see ``viva_vdm.core.cache.MongoCacheBackend``). Mongo removes the entries once
+    they have expired.
+    """
+
+    id = StringField(required=True, primary_key=True)
+    value = StringField(required=True)
+    expires_at = DateTimeField(required=True)
+
+    meta = {
+        'collection': 'api_cache',
+        'indexes': [{'fields': ['expires_at'], 'expireAfterSeconds': 0}],
+    }
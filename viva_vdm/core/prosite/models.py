@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseModel
 
@@ -43,3 +43,11 @@ class PrositeResult(BaseModel):
     cc_version: str
     start: str
     end: str
+
+
+class PrositeHit(BaseModel):
+    sequence_index: int
+    accession: str
+    start: int
+    end: int
+    fields: Dict[str, str]
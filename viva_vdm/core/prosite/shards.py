@@ -0,0 +1,108 @@
+import logging
+import os
+import shutil
+import tempfile
+from typing import List, Optional
+
+from .store import PrositeRecordStore
+from ..settings import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class PrositeDatabaseShards(object):
+    def __init__(self, prosite_db_path: Optional[str] = None, shards: Optional[int] = None):
+        """
+        Splits the Prosite database file into shards, so that the profiles can be scanned by many Prosite processes at
+        once. Every shard holds a contiguous range of records of about the same size, so scanning the shards in order
+        finds the hits in the same order as scanning the whole database.
+
+        The shards are kept in a directory next to the database file, and are rebuilt whenever the database file or
+        the number of shards changes.
+
+        :param prosite_db_path: The path to the Prosite database file (default: the PROSITE_DB_PATH setting).
+        :param shards: The number of shards (default: the PROSITE_DATABASE_SHARDS setting).
+
+        :type prosite_db_path: str
+        :type shards: int
+
+        Example:
+            >>> from viva_vdm.core.prosite.shards import PrositeDatabaseShards
+            >>> shard_paths = PrositeDatabaseShards(shards=4).get_paths()
+        """
+
+        settings = AppConfig()
+
+        self.prosite_db_path = prosite_db_path or settings.prosite_db_path
+        self.shards = max(1, shards or settings.prosite_database_shards)
+        self.shards_root = f'{self.prosite_db_path}.shards'
+
+    def _get_shards_dir(self) -> str:
+        stat = os.stat(self.prosite_db_path)
+
+        return os.path.join(self.shards_root, f'{stat.st_size}-{stat.st_mtime_ns}-{self.shards}')
+
+    def _get_shard_paths(self, shards_dir: str) -> List[str]:
+        return [os.path.join(shards_dir, f'prosite_{index}.dat') for index in range(self.shards)]
+
+    def build(self) -> List[str]:
+        """
+        Builds the shards of the current database file. The shards are written to a temporary directory first, which
+        is then moved in place, so that a partially written set of shards is never used.
+
+        :return: The paths to the shards, in the order of the records of the database.
+        """
+
+        shards_dir = self._get_shards_dir()
+        records = list(PrositeRecordStore(self.prosite_db_path).read_records())
+        shard_size = sum(len(raw_record) for _, raw_record in records) / self.shards
+
+        os.makedirs(self.shards_root, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=self.shards_root)
+
+        try:
+            shard_files = [open(path, 'w') for path in self._get_shard_paths(temp_dir)]
+
+            written = 0
+            for _, raw_record in records:
+                shard_files[min(int(written // shard_size), self.shards - 1)].write(raw_record)
+                written += len(raw_record)
+
+            for shard_file in shard_files:
+                shard_file.close()
+
+            os.rename(temp_dir, shards_dir)
+        except OSError:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+            # Another process has built the same shards in the meantime.
+            if not os.path.isdir(shards_dir):
+                raise
+
+        for name in os.listdir(self.shards_root):
+            path = os.path.join(self.shards_root, name)
+
+            if path != shards_dir:
+                shutil.rmtree(path, ignore_errors=True)
+
+        logger.info('Built %s Prosite database shards in %s', self.shards, shards_dir)
+
+        return self._get_shard_paths(shards_dir)
+
+    def get_paths(self) -> List[str]:
+        """
+        Gets the paths to the shards of the current database file, building them if needed. A single shard is the
+        database file itself.
+
+        :return: The paths to the shards, in the order of the records of the database.
+        """
+
+        if self.shards == 1:
+            return [self.prosite_db_path]
+
+        shards_dir = self._get_shards_dir()
+
+        if os.path.isdir(shards_dir):
+            return self._get_shard_paths(shards_dir)
+
+        return self.build()
@@ -0,0 +1,158 @@
+import io
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from Bio.ExPASy import Prosite
+from Bio.ExPASy.Prosite import Record
+
+from ..settings import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class PrositeRecordStore(object):
+    ACCESSION_PATTERN = re.compile(r'^AC\s+(PS\d+);', re.MULTILINE)
+
+    _lock = threading.Lock()
+
+    def __init__(self, prosite_db_path: Optional[str] = None):
+        """
+        A local, read-only store of the records of the Prosite database, indexed by accession. The store is an SQLite
+        file next to the Prosite database file, and is rebuilt whenever the database file changes.
+
+        :param prosite_db_path: The path to the Prosite database file (default: the PROSITE_DB_PATH setting).
+        :type prosite_db_path: str
+
+        Example:
+            >>> from viva_vdm.core.prosite.store import PrositeRecordStore
+            >>> store = PrositeRecordStore()
+            >>> record = store.get('PS00001')
+        """
+
+        self.prosite_db_path = prosite_db_path or AppConfig().prosite_db_path
+        self.store_path = f'{self.prosite_db_path}.sqlite'
+
+    def _get_source_version(self) -> str:
+        stat = os.stat(self.prosite_db_path)
+
+        return f'{stat.st_size}-{stat.st_mtime_ns}'
+
+    def read_records(self) -> Iterator[Tuple[str, str]]:
+        """
+        Splits the Prosite database file into its records, without parsing them.
+
+        :return: The accession and raw text of every record.
+        """
+
+        lines = list()
+
+        with open(self.prosite_db_path, 'r') as f:
+            for line in f:
+                lines.append(line)
+
+                if not line.startswith('//'):
+                    continue
+
+                raw_record = ''.join(lines)
+                lines = list()
+
+                match = self.ACCESSION_PATTERN.search(raw_record)
+
+                # The comments at the top of the file end like a record, but do not have an accession.
+                if match:
+                    yield match.group(1), raw_record
+
+    def _get_store_version(self) -> Optional[str]:
+        if not os.path.exists(self.store_path):
+            return None
+
+        try:
+            with sqlite3.connect(self.store_path) as connection:
+                row = connection.execute("SELECT value FROM meta WHERE key = 'source_version'").fetchone()
+        except sqlite3.DatabaseError:
+            return None
+
+        return row[0] if row else None
+
+    def build(self):
+        """
+        Builds the store from the Prosite database file. The store is written to a temporary file first, and then
+        moved in place, so that processes reading the current store are never affected.
+        """
+
+        source_version = self._get_source_version()
+        store_dir = os.path.dirname(os.path.abspath(self.store_path))
+
+        fd, temp_path = tempfile.mkstemp(suffix='.sqlite', dir=store_dir)
+        os.close(fd)
+
+        try:
+            with sqlite3.connect(temp_path) as connection:
+                connection.execute('CREATE TABLE records (accession TEXT PRIMARY KEY, record TEXT NOT NULL)')
+                connection.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+                connection.executemany('INSERT OR REPLACE INTO records VALUES (?, ?)', self.read_records())
+                connection.execute("INSERT INTO meta VALUES ('source_version', ?)", (source_version,))
+
+            connection.close()
+            os.replace(temp_path, self.store_path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        logger.info('Built Prosite record store %s', self.store_path)
+
+    def ensure_fresh(self):
+        """
+        Builds the store if it does not exist yet, or if the Prosite database file has changed since it was built.
+        """
+
+        if self._get_store_version() == self._get_source_version():
+            return
+
+        with self._lock:
+            if self._get_store_version() != self._get_source_version():
+                self.build()
+
+    def get_many(self, accessions: Tuple[str, ...]) -> Dict[str, Record]:
+        """
+        Gets the records of many Prosite accessions with a single query.
+
+        :param accessions: A list of Prosite accession IDs.
+        :type accessions: Tuple[str, ...]
+
+        :return: The records found in the store, by accession. Unknown accessions are left out.
+        """
+
+        self.ensure_fresh()
+
+        accessions = tuple(dict.fromkeys(accessions))
+
+        if not accessions:
+            return dict()
+
+        with sqlite3.connect(f'file:{self.store_path}?mode=ro', uri=True) as connection:
+            rows = connection.execute(
+                f'SELECT accession, record FROM records WHERE accession IN ({", ".join("?" * len(accessions))})',
+                accessions,
+            ).fetchall()
+
+        connection.close()
+
+        return {accession: Prosite.read(io.StringIO(raw_record)) for accession, raw_record in rows}
+
+    def get(self, accession: str) -> Optional[Record]:
+        """
+        Gets the record of a Prosite accession.
+
+        :param accession: A Prosite accession ID.
+        :type accession: str
+
+        :return: The record of the accession, or None if it is not in the store.
+        """
+
+        return self.get_many((accession,)).get(accession)
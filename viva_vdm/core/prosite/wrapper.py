@@ -1,10 +1,12 @@
-import random
-import string
+import math
+import os
 import tempfile
 import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
-from subprocess import CompletedProcess, run, PIPE
-from typing import Optional, List
+from subprocess import Popen, PIPE
+from typing import IO, Dict, Optional, List, Iterable, Iterator, Tuple
 from urllib.error import URLError, HTTPError
 
 import backoff
@@ -14,7 +16,9 @@ from Bio.ExPASy import Prosite
 from Bio.ExPASy.Prosite import Record
 
 from .exceptions import PrositeError
-from .models import PrositeResult
+from .models import PrositeResult, PrositeHit
+from .shards import PrositeDatabaseShards
+from .store import PrositeRecordStore
 from ..settings import AppConfig
 
 
@@ -41,7 +45,14 @@ class PrositeScan(object):
     }
 
     ENTRY_ID_PATTERN = re.compile(r'(?=PS)([^|]*)')
-    START_END_PATTERN = re.compile(r'/(\d*)-(\d*)')
+    LOCATION_PATTERN = re.compile(r'>(\S+?)/(\d+)-(\d+)(.*)')
+    FIELD_PATTERN = re.compile(r'(\w+)=(\S+)')
+    RELEASE_PATTERN = re.compile(r'Release (\S+)')
+
+    SEQUENCE_NAME_PREFIX = 'hcs'
+
+    # The Prosite records of the hits of a shard are read from the store a batch of hits at a time.
+    RECORD_BATCH_SIZE = 500
 
     def __init__(
         self,
@@ -131,9 +142,12 @@ class PrositeScan(object):
         self.show_prof_start_end = show_prof_start_end
         self.output_width = output_width
 
-    def _generate_arguments(self) -> List[str]:
+    def _generate_arguments(self, database_path: Optional[str] = None) -> List[str]:
         """
         A central place to generate the arguments to be passed to Python subprocess.
+
+        :param database_path: The Prosite database (shard) to scan (default: the PROSITE_DB_PATH setting).
+        :type database_path: str
         """
 
         arguments = list()
@@ -151,22 +165,47 @@ class PrositeScan(object):
         settings = AppConfig()
 
         arguments = [settings.prosite_exe_path] + arguments
-        arguments.append(settings.prosite_db_path)
+        arguments.append(database_path or settings.prosite_db_path)
 
         return arguments
 
     @classmethod
-    def _run_prosite(cls, arguments: List[str]) -> CompletedProcess:
+    def _run_prosite(cls, arguments: List[str], stderr: IO) -> Popen:
         """
-        Runs the Prosite CLI tool.
+        Starts the Prosite CLI tool, with its output available to be read from a pipe while it is running.
 
         :param arguments: A list of arguments to pass to Python subprocess including the path to the Prosite binary.
+        :param stderr: A file to write the stderr to. It is not piped, so that the process can never block on it.
+
         :type arguments: List[str]
+        :type stderr: IO
 
-        :return: A completed process that can then be used to get the stderr, stdout, etc.
+        :return: The running process, with its stdout opened in text mode.
         """
 
-        return run(arguments, stderr=PIPE, stdout=PIPE)
+        return Popen(arguments, stdout=PIPE, stderr=stderr, text=True)
+
+    @classmethod
+    def get_database_release(cls) -> str:
+        """
+        Reads the release of the Prosite database from the comments at the top of the database file. If the release
+        cannot be found, the size and modification time of the file are used instead.
+
+        :return: The release of the Prosite database in use.
+        """
+
+        prosite_db_path = AppConfig().prosite_db_path
+
+        with open(prosite_db_path, 'r') as f:
+            for line in islice(f, 100):
+                match = cls.RELEASE_PATTERN.search(line)
+
+                if line.startswith('CC') and match:
+                    return match.group(1).rstrip('.,')
+
+        stat = os.stat(prosite_db_path)
+
+        return f'{stat.st_size}-{int(stat.st_mtime)}'
 
     @classmethod
     @backoff.on_exception(backoff.expo, (URLError, HTTPError), max_time=600)
@@ -186,17 +225,18 @@ class PrositeScan(object):
 
         return record
 
-    def _save_sequences_to_tempfile(self, sequence: str) -> str:
+    def _save_sequences_to_tempfile(self, sequences: List[str]) -> str:
         """
-        Converts the provided sequence into a FASTA file, and saves it in the temporary directory.
+        Converts the provided sequences into a single FASTA file, and saves it in the temporary directory. The file
+        has to be removed by the caller.
 
-        :param sequence: An amino-acid sequence.
-        :type sequence: str
+        :param sequences: A list of amino-acid sequences.
+        :type sequences: List[str]
 
-        :return: An absolute path to a fle containing the FASTA sequence.
+        :return: An absolute path to a fle containing the FASTA sequences.
         """
 
-        fasta_sequences = self._fasta_from_sequence(sequence)
+        fasta_sequences = self._fasta_from_sequences(sequences)
 
         with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
             f.write(fasta_sequences)
@@ -204,19 +244,23 @@ class PrositeScan(object):
         return f.name
 
     @classmethod
-    def _fasta_from_sequence(cls, sequence: str) -> str:
+    def _get_sequence_name(cls, index: int) -> str:
+        # Lowercase, so that the name can never be mistaken for a Prosite accession in the output.
+        return f'{cls.SEQUENCE_NAME_PREFIX}{index}'
+
+    @classmethod
+    def _fasta_from_sequences(cls, sequences: List[str]) -> str:
         """
-        Converts a given sequence into FASTA format by randomly generating a FASTA header.
+        Converts the given sequences into FASTA format. The header of every sequence is derived from its position, so
+        that hits can be assigned back to it.
 
-        :param sequence: An amino-acid sequence.
-        :type sequence: str
+        :param sequences: A list of amino-acid sequences.
+        :type sequences: List[str]
 
-        :return: A FASTA-formatted sequence.
+        :return: FASTA-formatted sequences.
         """
 
-        random_string_list = [random.choice(string.ascii_uppercase) for _ in range(5)]
-
-        return f'>{"".join(random_string_list)}\n{sequence}\n'
+        return ''.join(f'>{cls._get_sequence_name(index)}\n{sequence}\n' for index, sequence in enumerate(sequences))
 
     @classmethod
     def _add_sequences_arg(cls, arguments: List[str], sequences_path: str) -> List[str]:
@@ -238,44 +282,212 @@ class PrositeScan(object):
 
         return arguments
 
-    def scan(self, sequence: str) -> List[PrositeResult]:
+    def _parse_hits(self, lines: Iterable[str], offset: int = 0) -> Iterator[PrositeHit]:
         """
-        This is the main method of the Prosite class. First initialize the class with the desired configuration,
-        and then use this method to run scan tool.
+        Parses the xPSA output of the Prosite tool line by line, as it is read. Only the header of every hit is used,
+        which holds its location and its keyword=value fields, e.g.:
 
-        :param sequence: An amino-acid sequence.
-        :type sequence: str
+            >hcs0/12-34 motif=PS00001|ASN_GLYCOSYLATION norm_score=8.5 raw_score=104 level=0
 
-        :return: A list of Prosite hits.
+        :param lines: The lines of the output.
+        :param offset: The index of the first sequence within all the sequences being scanned.
+
+        :type lines: Iterable[str]
+        :type offset: int
+
+        :return: The hits, in the order of the output.
+        """
+
+        for line in lines:
+            match = self.LOCATION_PATTERN.match(line)
+
+            if not match:
+                continue
+
+            sequence_name, start, end, header_fields = match.groups()
+            fields = dict(self.FIELD_PATTERN.findall(header_fields))
+
+            if 'motif' in fields:
+                accession = fields['motif'].split('|', 1)[0]
+            else:
+                accession = self.ENTRY_ID_PATTERN.search(header_fields).group(0)
+
+            yield PrositeHit(
+                sequence_index=offset + int(sequence_name[len(self.SEQUENCE_NAME_PREFIX) :]),  # noqa: E203
+                accession=accession,
+                start=int(start),
+                end=int(end),
+                fields=fields,
+            )
+
+    def _scan_shard(self, offset: int, sequences: List[str], database_path: str) -> Iterator[PrositeHit]:
         """
+        Runs the Prosite tool once, for some of the sequences against one shard of the database. Hits are yielded
+        while the tool is still running.
 
-        arguments = self._generate_arguments()
-        sequences_file = self._save_sequences_to_tempfile(sequence)
+        :param offset: The index of the first sequence within all the sequences being scanned.
+        :param sequences: The sequences of the shard.
+        :param database_path: The database shard to scan the sequences against.
 
+        :type offset: int
+        :type sequences: List[str]
+        :type database_path: str
+
+        :return: The hits, with the index of their sequence within all the sequences being scanned.
+        """
+
+        arguments = self._generate_arguments(database_path)
+        sequences_file = self._save_sequences_to_tempfile(sequences)
         arguments = self._add_sequences_arg(arguments, sequences_file)
-        process = self._run_prosite(arguments)
 
-        if process.returncode != 0:
-            raise PrositeError(process.stderr.decode('utf-8'))
+        try:
+            with tempfile.TemporaryFile() as stderr, self._run_prosite(arguments, stderr) as process:
+                try:
+                    yield from self._parse_hits(process.stdout, offset)
+                except BaseException:
+                    # The hits are no longer wanted (or could not be parsed), so the tool does not need to finish.
+                    process.kill()
+                    raise
+
+                if process.wait() != 0:
+                    stderr.seek(0)
+                    raise PrositeError(stderr.read().decode('utf-8'))
+        finally:
+            os.remove(sequences_file)
+
+    def iter_hits(self, sequences: List[str]) -> Iterator[PrositeHit]:
+        """
+        Scans many sequences with a single run of the Prosite tool against the whole database, and yields the hits as
+        soon as the tool reports them, without resolving their Prosite records.
+
+        :param sequences: A list of amino-acid sequences.
+        :type sequences: List[str]
 
-        prosite_entries = list()
-        results = process.stdout.decode('utf-8')
+        :return: The hits, in the order of the sequences.
 
-        entries = results.split(">")
+        Example:
+            >>> from viva_vdm.core.prosite import PrositeScan
+            >>> scanner = PrositeScan(output_xpsa=True, cutoff_value=-1, is_fasta=True, show_prof_start_end=True)
+            >>> for hit in scanner.iter_hits(["SSVSSFERFEIFPKESSWPNHNTNGVTAACSHEGKSSFYRNLLWLTEKE", "MDSNTVSSFQDI"]):
+            ...     print(hit.sequence_index, hit.accession)
+        """
+
+        if not sequences:
+            return
+
+        yield from self._scan_shard(0, sequences, AppConfig().prosite_db_path)
 
-        # The first element is empty so we remove it.
-        entries.pop(0)
+    def _get_result(self, hit: PrositeHit, records: Dict[str, Record]) -> PrositeResult:
+        record = records.get(hit.accession)
 
-        for entry in entries:
-            accession = re.search(self.ENTRY_ID_PATTERN, entry).group(0)
-            start = re.search(self.START_END_PATTERN, entry).group(1)
-            end = re.search(self.START_END_PATTERN, entry).group(2)
+        if record is None:
+            # The hits come from the same database file as the store, so the public API is only a fallback.
+            record = records[hit.accession] = self._get_prosite_entry(hit.accession)
+
+        prosite_entry = dict(record.__dict__)
+
+        prosite_entry['start'] = str(hit.start)
+        prosite_entry['end'] = str(hit.end)
+
+        return PrositeResult(**prosite_entry)
+
+    def _collect_shard_results(
+        self, shard: Tuple[int, List[str], str], store: PrositeRecordStore, records: Dict[str, Record]
+    ) -> Dict[int, List[PrositeResult]]:
+        """
+        Scans a shard, and turns its hits into results while the tool is still running, a batch of hits at a time.
 
-            remote_prosite_entry = self._get_prosite_entry(accession).__dict__
+        :param shard: The offset of the first sequence, the sequences, and the database path of the shard.
+        :param store: The store the Prosite records of the hits are read from.
+        :param records: The Prosite records read so far by accession, shared by all the shards of the scan.
 
-            remote_prosite_entry['start'] = start
-            remote_prosite_entry['end'] = end
+        :type shard: Tuple[int, List[str], str]
+        :type store: PrositeRecordStore
+        :type records: Dict[str, Record]
+
+        :return: The results of the shard, by the index of their sequence within all the sequences being scanned.
+        """
+
+        results = dict()
+        hits = self._scan_shard(*shard)
+
+        try:
+            while True:
+                batch = list(islice(hits, self.RECORD_BATCH_SIZE))
+
+                if not batch:
+                    return results
+
+                missing_accessions = tuple(
+                    dict.fromkeys(hit.accession for hit in batch if hit.accession not in records)
+                )
+
+                if missing_accessions:
+                    records.update(store.get_many(missing_accessions))
+
+                for hit in batch:
+                    results.setdefault(hit.sequence_index, list()).append(self._get_result(hit, records))
+        finally:
+            hits.close()
+
+    def scan_many(self, sequences: List[str]) -> List[List[PrositeResult]]:
+        """
+        Scans many sequences with a single run of the Prosite tool.
 
-            prosite_entries.append(PrositeResult(**remote_prosite_entry))
+        :param sequences: A list of amino-acid sequences.
+        :type sequences: List[str]
+
+        :return: A list of Prosite hits for every sequence, in the order of the sequences.
+
+        Example:
+            >>> from viva_vdm.core.prosite import PrositeScan
+            >>> scanner = PrositeScan(output_xpsa=True, cutoff_value=-1, is_fasta=True, show_prof_start_end=True)
+            >>> results = scanner.scan_many(["SSVSSFERFEIFPKESSWPNHNTNGVTAACSHEGKSSFYRNLLWLTEKE", "MDSNTVSSFQDI"])
+        """
+
+        if not sequences:
+            return list()
+
+        settings = AppConfig()
+        database_paths = PrositeDatabaseShards(shards=settings.prosite_database_shards).get_paths()
+        workers = max(1, settings.prosite_workers)
+
+        # When there are more workers than database shards, the sequences are split up as well.
+        chunk_size = math.ceil(len(sequences) / min(len(sequences), math.ceil(workers / len(database_paths))))
+        shards = [
+            (offset, sequences[offset : offset + chunk_size], database_path)  # noqa: E203
+            for offset in range(0, len(sequences), chunk_size)
+            for database_path in database_paths
+        ]
+
+        store = PrositeRecordStore()
+        records = dict()
+
+        def collect(shard: Tuple[int, List[str], str]) -> Dict[int, List[PrositeResult]]:
+            return self._collect_shard_results(shard, store, records)
+
+        if len(shards) == 1 or workers == 1:
+            shard_results = [collect(shard) for shard in shards]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(shards)), thread_name_prefix='pfscan') as executor:
+                shard_results = list(executor.map(collect, shards))
+
+        # Shards are merged in the order of the sequences and then the database, so hits are in the same order as if
+        # the whole batch had been scanned against the whole database.
+        return [
+            [result for results in shard_results for result in results.get(sequence_index, list())]
+            for sequence_index in range(len(sequences))
+        ]
+
+    def scan(self, sequence: str) -> List[PrositeResult]:
+        """
+        This is the main method of the Prosite class. First initialize the class with the desired configuration,
+        and then use this method to run scan tool.
+
+        :param sequence: An amino-acid sequence.
+        :type sequence: str
+
+        :return: A list of Prosite hits.
+        """
 
-        return prosite_entries
+        return self.scan_many([sequence])[0]
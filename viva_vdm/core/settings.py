@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic import BaseSettings
 
 
@@ -20,6 +22,47 @@ class ResourceConfig(BaseSettings):
     rabbitmq_username: str
     rabbitmq_password: str
 
+    # Job stages are routed to these queues so that CPU bound predictions and IO bound remote lookups can be served by
+    # separately scaled worker pools.
+    celery_default_queue: str = 'celery'
+    celery_cpu_queue: str = 'cpu'
+    celery_io_queue: str = 'io'
+
+    # Analysis results are cached by content, entries expire once they have not been read for ``result_cache_ttl``
+    # seconds, and the least recently read entries are evicted beyond ``result_cache_max_entries``.
+    result_cache_enabled: bool = True
+    result_cache_ttl: int = 2592000
+    result_cache_max_entries: int = 100000
+
+    # The pymongo client behind ``aio.get_database()``, whose blocking reads the API runs on a dedicated thread pool of
+    # ``mongo_async_max_pool_size`` threads, one per connection of the pool. Requests wait up to
+    # ``mongo_async_wait_queue_timeout_ms`` for a free connection once all ``mongo_async_max_pool_size`` are in use.
+    mongo_async_max_pool_size: int = 100
+    mongo_async_min_pool_size: int = 10
+    mongo_async_max_idle_time_ms: int = 60000
+    mongo_async_wait_queue_timeout_ms: int = 5000
+
+    # Job progress streams are woken up by Mongo change streams, and poll the job every ``job_events_poll_interval``
+    # seconds when change streams are not available (Mongo is not a replica set). Idle streams send a keep-alive every
+    # ``job_events_heartbeat_interval`` seconds.
+    job_events_poll_interval: float = 2.0
+    job_events_heartbeat_interval: float = 15.0
+
+    # API responses are cached either in the memory of every process, bounded to ``api_cache_max_entries`` entries, or
+    # in Mongo, shared by every replica of the API.
+    api_cache_backend: Literal['memory', 'mongo'] = 'memory'
+    api_cache_max_entries: int = 10000
+
+    # The pool of connections to NCBI, shared by all the requests of the process.
+    ncbi_max_connections: int = 10
+    ncbi_timeout: float = 10.0
+
+    # Taxonomy autocomplete is answered from a local index of the NCBI taxdump names file, which is memory-mapped up to
+    # ``taxonomy_mmap_size`` bytes. NCBI is only queried if the index has not been built.
+    taxonomy_names_path: Optional[str] = None
+    taxonomy_mmap_size: int = 536870912
+    taxonomy_suggestions_limit: int = 20
+
     class Config:
         env_file: str = '.env'
         validate_assignment: bool = True
@@ -35,12 +78,69 @@ class ResourceConfig(BaseSettings):
             'rabbitmq_username': {'env': ['RABBITMQ_USERNAME']},
             'rabbitmq_password': {'env': ['RABBITMQ_PASSWORD']},
             'mongo_host': {'env': ['MONGO_DDM_HOST']},
+            'celery_default_queue': {'env': ['CELERY_DEFAULT_QUEUE']},
+            'celery_cpu_queue': {'env': ['CELERY_CPU_QUEUE']},
+            'celery_io_queue': {'env': ['CELERY_IO_QUEUE']},
+            'result_cache_enabled': {'env': ['RESULT_CACHE_ENABLED']},
+            'result_cache_ttl': {'env': ['RESULT_CACHE_TTL']},
+            'result_cache_max_entries': {'env': ['RESULT_CACHE_MAX_ENTRIES']},
+            'mongo_async_max_pool_size': {'env': ['MONGO_ASYNC_MAX_POOL_SIZE']},
+            'mongo_async_min_pool_size': {'env': ['MONGO_ASYNC_MIN_POOL_SIZE']},
+            'mongo_async_max_idle_time_ms': {'env': ['MONGO_ASYNC_MAX_IDLE_TIME_MS']},
+            'mongo_async_wait_queue_timeout_ms': {'env': ['MONGO_ASYNC_WAIT_QUEUE_TIMEOUT_MS']},
+            'job_events_poll_interval': {'env': ['JOB_EVENTS_POLL_INTERVAL']},
+            'job_events_heartbeat_interval': {'env': ['JOB_EVENTS_HEARTBEAT_INTERVAL']},
+            'api_cache_backend': {'env': ['API_CACHE_BACKEND']},
+            'api_cache_max_entries': {'env': ['API_CACHE_MAX_ENTRIES']},
+            'ncbi_max_connections': {'env': ['NCBI_MAX_CONNECTIONS']},
+            'ncbi_timeout': {'env': ['NCBI_TIMEOUT']},
+            'taxonomy_names_path': {'env': ['TAXONOMY_NAMES_PATH']},
+            'taxonomy_mmap_size': {'env': ['TAXONOMY_MMAP_SIZE']},
+            'taxonomy_suggestions_limit': {'env': ['TAXONOMY_SUGGESTIONS_LIMIT']},
         }
 
 
 class AppConfig(BaseSettings):
     prosite_exe_path: str
     prosite_db_path: str
+    # The Prosite database is split into this many shards, and up to ``prosite_workers`` Prosite processes scan the
+    # shards (and chunks of the sequences, if there are more workers than shards) at the same time.
+    prosite_database_shards: int = 1
+    prosite_workers: int = 1
+
+    # When enabled, the workflow runs the independent stages of every HCS at the same time, each stage on its own
+    # pool of threads sized by the matching ``workflow_*_workers`` setting.
+    workflow_concurrent: bool = False
+    workflow_prosite_workers: int = 2
+    workflow_mhci_workers: int = 2
+    workflow_mhcii_workers: int = 2
+    workflow_blast_workers: int = 4
+    # The number of HCS a stage analyses in one go, both in the workflow and in every distributed stage task. Batching
+    # lets predictors be set up once for many sequences.
+    workflow_batch_size: int = 25
+
+    # Load the MHCflurry models when a worker process starts, rather than on its first MHC I prediction.
+    mhcflurry_warm_up: bool = True
+
+    # BLAST searches run either on the remote BVU BLAST server, or with a local BLAST+ installation (``blast_exe_path``
+    # is the path to ``blastp``) against the databases formatted in ``blast_db_dir``, with ``blast_threads`` threads.
+    blast_backend: Literal['remote', 'local'] = 'remote'
+    blast_exe_path: Optional[str] = None
+    blast_db_dir: Optional[str] = None
+    blast_threads: int = 1
+
+    # At most this many BLAST jobs of a batch run at a time, and their status is polled with an exponential backoff
+    # starting at ``blast_poll_interval`` seconds, up to ``blast_max_poll_interval`` seconds.
+    blast_max_in_flight: int = 4
+    blast_poll_interval: float = 2.0
+    blast_max_poll_interval: float = 30.0
+    # A BLAST job that has not completed after this many seconds (e.g. one stuck in a queue) is given up on.
+    blast_timeout: float = 3600.0
+    # Sequences are submitted to BLAST as multi-query jobs of up to this many sequences.
+    blast_queries_per_job: int = 1
+
+    # Part of the result cache key of BLAST results, bump it whenever the remote BLAST databases are updated.
+    blast_database_release: str = 'unversioned'
 
     class Config:
         env_file: str = '.env'
@@ -51,4 +151,23 @@ class AppConfig(BaseSettings):
         fields = {
             'prosite_exe_path': {'env': ['PROSITE_INSTALL_PATH']},
             'prosite_db_path': {'env': ['PROSITE_DB_PATH']},
+            'prosite_database_shards': {'env': ['PROSITE_DATABASE_SHARDS']},
+            'prosite_workers': {'env': ['PROSITE_WORKERS']},
+            'workflow_concurrent': {'env': ['WORKFLOW_CONCURRENT']},
+            'workflow_prosite_workers': {'env': ['WORKFLOW_PROSITE_WORKERS']},
+            'workflow_mhci_workers': {'env': ['WORKFLOW_MHCI_WORKERS']},
+            'workflow_mhcii_workers': {'env': ['WORKFLOW_MHCII_WORKERS']},
+            'workflow_blast_workers': {'env': ['WORKFLOW_BLAST_WORKERS']},
+            'workflow_batch_size': {'env': ['WORKFLOW_BATCH_SIZE']},
+            'mhcflurry_warm_up': {'env': ['MHCFLURRY_WARM_UP']},
+            'blast_backend': {'env': ['BLAST_BACKEND']},
+            'blast_exe_path': {'env': ['BLAST_INSTALL_PATH']},
+            'blast_db_dir': {'env': ['BLAST_DB_PATH']},
+            'blast_threads': {'env': ['BLAST_THREADS']},
+            'blast_max_in_flight': {'env': ['BLAST_MAX_IN_FLIGHT']},
+            'blast_poll_interval': {'env': ['BLAST_POLL_INTERVAL']},
+            'blast_max_poll_interval': {'env': ['BLAST_MAX_POLL_INTERVAL']},
+            'blast_timeout': {'env': ['BLAST_TIMEOUT']},
+            'blast_queries_per_job': {'env': ['BLAST_QUERIES_PER_JOB']},
+            'blast_database_release': {'env': ['BLAST_DATABASE_RELEASE']},
         }
@@ -1 +1,2 @@
-from .job import vita_job
+from .job import vita_job, finalise_vita_job, fail_vita_job
+from .stages import prosite_stage, mhci_stage, mhcii_stage, blast_stage
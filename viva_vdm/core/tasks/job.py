@@ -1,7 +1,40 @@
+from celery import chord, group
+
 from viva_vdm.core.celery_app import app
+from viva_vdm.core.tasks.stages import STAGE_TASKS
 from viva_vdm.core.workflow.vita_workflow import VitaWorkflow
 
 
 @app.task(name='Job')
 def vita_job(job_id: str):
-    VitaWorkflow(job_id=job_id).process()
+    """
+    Splits the job into one subtask per stage and batch of HCS (see ``workflow_batch_size``), so that a job can be
+    spread over all the workers listening on the stage queues. Once every subtask has succeeded the chord callback
+    completes the job. If a subtask (or the callback) fails, the error callback of the chord marks the job as failed.
+    """
+
+    workflow = VitaWorkflow(job_id=job_id)
+
+    if not workflow.start():
+        return
+
+    # A redelivered job only dispatches the stages that were not completed before it was interrupted.
+    pending_batches = workflow.get_pending_batches()
+
+    if not pending_batches:
+        workflow.finish()
+        return
+
+    header = group(STAGE_TASKS[context].si(job_id, hcs_ids) for context, hcs_ids in pending_batches)
+
+    chord(header)(finalise_vita_job.si(job_id).on_error(fail_vita_job.si(job_id)))
+
+
+@app.task(name='FinaliseJob')
+def finalise_vita_job(job_id: str):
+    VitaWorkflow(job_id=job_id).finish()
+
+
+@app.task(name='FailJob')
+def fail_vita_job(job_id: str):
+    VitaWorkflow(job_id=job_id).fail()
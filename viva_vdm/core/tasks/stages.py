@@ -0,0 +1,33 @@
+from typing import List
+
+from viva_vdm.core.celery_app import app
+from viva_vdm.core.models import LoggerContexts
+from viva_vdm.core.workflow.vita_workflow import VitaWorkflow
+
+
+@app.task(name='Prosite')
+def prosite_stage(job_id: str, hcs_ids: List[str]):
+    VitaWorkflow(job_id=job_id).run_stage(LoggerContexts.prosite, hcs_ids)
+
+
+@app.task(name='MHCI')
+def mhci_stage(job_id: str, hcs_ids: List[str]):
+    VitaWorkflow(job_id=job_id).run_stage(LoggerContexts.mhci, hcs_ids)
+
+
+@app.task(name='MHCII')
+def mhcii_stage(job_id: str, hcs_ids: List[str]):
+    VitaWorkflow(job_id=job_id).run_stage(LoggerContexts.mhcii, hcs_ids)
+
+
+@app.task(name='Blast')
+def blast_stage(job_id: str, hcs_ids: List[str]):
+    VitaWorkflow(job_id=job_id).run_stage(LoggerContexts.blast, hcs_ids)
+
+
+STAGE_TASKS = {
+    LoggerContexts.prosite: prosite_stage,
+    LoggerContexts.mhci: mhci_stage,
+    LoggerContexts.mhcii: mhcii_stage,
+    LoggerContexts.blast: blast_stage,
+}
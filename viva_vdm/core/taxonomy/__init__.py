@@ -0,0 +1 @@
+from .index import TaxonomyIndex, get_taxonomy_index
@@ -0,0 +1,221 @@
+import logging
+import os
+import sqlite3
+import tarfile
+import tempfile
+import threading
+import urllib.request
+from typing import Iterator, List, Optional, Tuple
+
+from ..settings import ResourceConfig
+
+logger = logging.getLogger(__name__)
+
+NCBI_TAXDUMP_URL = 'https://ftp.ncbi.nlm.nih.gov/pub/taxonomy/taxdump.tar.gz'
+
+
+class TaxonomyIndex(object):
+    NAME_CLASSES = ('scientific name', 'genbank common name', 'common name')
+
+    def __init__(self, names_path: Optional[str] = None):
+        """
+        A local, read-only prefix index of the names of the NCBI taxonomy, built from the ``names.dmp`` file of the
+        NCBI taxdump. The index is an SQLite file next to the names file, clustered on the lower-cased names, so that
+        a prefix search is a single range scan of the index. Every thread reads it through its own memory-mapped
+        connection.
+
+        :param names_path: The path to the names.dmp file (default: the TAXONOMY_NAMES_PATH setting).
+        :type names_path: str
+
+        Example:
+            >>> from viva_vdm.core.taxonomy import TaxonomyIndex
+            >>> index = TaxonomyIndex()
+            >>> index.search('influenza a')
+            [(11320, 'Influenza A virus'), ...]
+        """
+
+        self.settings = ResourceConfig()
+
+        self.names_path = names_path or self.settings.taxonomy_names_path
+        self.index_path = f'{self.names_path}.sqlite' if self.names_path else None
+
+        self._local = threading.local()
+
+    def is_available(self) -> bool:
+        """
+        :return: Whether the index has been built.
+        """
+
+        return self.index_path is not None and os.path.exists(self.index_path)
+
+    def read_names(self) -> Iterator[Tuple[str, int, str, bool]]:
+        """
+        Reads the scientific and common names of the NCBI taxonomy from the names.dmp file.
+
+        :return: The lower-cased name, taxonomy ID, and name of every name, and whether it is the scientific name.
+        """
+
+        with open(self.names_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # Every line is "tax_id\t|\tname_txt\t|\tunique name\t|\tname class\t|".
+                fields = line.rstrip('\t|\n').split('\t|\t')
+
+                if len(fields) < 4 or fields[3] not in self.NAME_CLASSES:
+                    continue
+
+                yield fields[1].lower(), int(fields[0]), fields[1], fields[3] == self.NAME_CLASSES[0]
+
+    def build(self):
+        """
+        Builds the index from the names file. The index is written to a temporary file first, and then moved in place,
+        so that processes searching the current index are never affected, and pick the new index up on their next
+        search.
+        """
+
+        index_dir = os.path.dirname(os.path.abspath(self.index_path))
+
+        fd, temp_path = tempfile.mkstemp(suffix='.sqlite', dir=index_dir)
+        os.close(fd)
+
+        try:
+            with sqlite3.connect(temp_path) as connection:
+                connection.execute(
+                    'CREATE TABLE names ('
+                    'name_key TEXT NOT NULL, taxid INTEGER NOT NULL, name TEXT NOT NULL, '
+                    'is_scientific INTEGER NOT NULL, '
+                    'PRIMARY KEY (name_key, taxid)) WITHOUT ROWID'
+                )
+                connection.execute('CREATE TABLE taxa (taxid INTEGER PRIMARY KEY, name TEXT NOT NULL)')
+                connection.executemany('INSERT OR IGNORE INTO names VALUES (?, ?, ?, ?)', self.read_names())
+                connection.execute('INSERT OR IGNORE INTO taxa SELECT taxid, name FROM names WHERE is_scientific')
+
+            connection.close()
+            os.replace(temp_path, self.index_path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+        logger.info('Built taxonomy index %s', self.index_path)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        inode = os.stat(self.index_path).st_ino
+        connection = getattr(self._local, 'connection', None)
+
+        # The index has been rebuilt (replaced) since this thread connected to it.
+        if connection is not None and self._local.inode != inode:
+            connection.close()
+            connection = None
+
+        if connection is None:
+            connection = sqlite3.connect(f'file:{self.index_path}?mode=ro', uri=True)
+            connection.execute(f'PRAGMA mmap_size = {int(self.settings.taxonomy_mmap_size)}')
+
+            self._local.connection, self._local.inode = connection, inode
+
+        return connection
+
+    def open(self):
+        """
+        Connects the current thread to the index, and maps it into memory, e.g. when the API starts.
+        """
+
+        connection = self._get_connection()
+
+        # Touching every page of the index loads it into the page cache, and so into the memory map.
+        connection.execute('SELECT count(*) FROM names').fetchone()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, str]]:
+        """
+        Searches the taxa by the start of any of their names, ignoring case. Every taxon is only returned once, by its
+        scientific name.
+
+        :param query: The start of the name of the taxon.
+        :param limit: The maximum number of taxa returned (default: the TAXONOMY_SUGGESTIONS_LIMIT setting).
+
+        :type query: str
+        :type limit: int
+
+        :return: The taxonomy ID and scientific name of the matching taxa, in the alphabetical order of the names that
+            matched.
+        """
+
+        prefix = query.strip().lower()
+        limit = limit or self.settings.taxonomy_suggestions_limit
+
+        if not prefix:
+            return list()
+
+        rows = self._get_connection().execute(
+            'SELECT names.taxid, coalesce(taxa.name, names.name) FROM names LEFT JOIN taxa USING (taxid) '
+            'WHERE name_key >= ? AND name_key < ? ORDER BY name_key',
+            (prefix, prefix + '\uffff'),
+        )
+        taxa = dict()
+
+        # The names of a taxon (e.g. its scientific and common names) often share a prefix, so the rows are only read
+        # until enough distinct taxa have been found.
+        for taxid, name in rows:
+            taxa.setdefault(taxid, name)
+
+            if len(taxa) >= limit:
+                break
+
+        rows.close()
+
+        return list(taxa.items())
+
+
+_taxonomy_index: Optional[TaxonomyIndex] = None
+
+
+def get_taxonomy_index() -> TaxonomyIndex:
+    """
+    Returns the taxonomy index of this process.
+    """
+
+    global _taxonomy_index
+
+    if _taxonomy_index is None:
+        _taxonomy_index = TaxonomyIndex()
+
+    return _taxonomy_index
+
+
+def download_names(directory: str) -> str:
+    """
+    Downloads the NCBI taxdump, and extracts its names.dmp file.
+
+    :param directory: The directory to extract the names file to.
+    :type directory: str
+
+    :return: The path to the names file.
+    """
+
+    archive_path = os.path.join(directory, 'taxdump.tar.gz')
+    names_path = os.path.join(directory, 'names.dmp')
+
+    urllib.request.urlretrieve(NCBI_TAXDUMP_URL, archive_path)
+
+    with tarfile.open(archive_path, 'r:gz') as tar:
+        tar.extract('names.dmp', path=directory)
+
+    os.remove(archive_path)
+
+    return names_path
+
+
+def main():
+    """
+    Downloads the latest NCBI taxdump and rebuilds the taxonomy index in place, e.g. periodically from a cron job. The
+    API picks the new index up without a restart.
+    """
+
+    logging.basicConfig(level=logging.INFO)
+
+    names_path = ResourceConfig().taxonomy_names_path
+
+    if not names_path:
+        raise ValueError('TAXONOMY_NAMES_PATH is not set, run the setup first')
+
+    download_names(os.path.dirname(os.path.abspath(names_path)))
+    TaxonomyIndex(names_path).build()
@@ -1,39 +1,46 @@
 import functools
+import threading
 
 from viva_vdm.core.models import JobDBModel
 from viva_vdm.core.models.models import JobStatuses, LoggerFlags, LoggerMessageMap
 
+# Stages may run on several threads at once while sharing the same job instance, so writes to it are serialised.
+_feedback_lock = threading.RLock()
+
 
 def handle_feedback(context: str):
     def _(fn):
         @functools.wraps(fn)
         def wrapper(self, *args, **kwargs):
             try:
-                JobDBModel.objects.update_log(
-                    instance=self.job_instance,
-                    context=context,
-                    flag=LoggerFlags.info,
-                    msg=LoggerMessageMap.running[context],
-                )
+                with _feedback_lock:
+                    JobDBModel.objects.update_log(
+                        instance=self.job_instance,
+                        context=context,
+                        flag=LoggerFlags.info,
+                        msg=LoggerMessageMap.running[context],
+                    )
 
                 fn(self, *args, **kwargs)
 
-                JobDBModel.objects.update_log(
-                    instance=self.job_instance,
-                    context=context,
-                    flag=LoggerFlags.info,
-                    msg=LoggerMessageMap.completed[context],
-                )
+                with _feedback_lock:
+                    JobDBModel.objects.update_log(
+                        instance=self.job_instance,
+                        context=context,
+                        flag=LoggerFlags.info,
+                        msg=LoggerMessageMap.completed[context],
+                    )
             except Exception as ex:
                 print(f'Unexpected exception occurred: {ex}')
 
-                JobDBModel.objects.update_log(
-                    instance=self.job_instance,
-                    context=context,
-                    flag=LoggerFlags.error,
-                    msg=LoggerMessageMap.error[context].format(error=str(ex)),
-                )
-                JobDBModel.objects.update_status(instance=self.job_instance, status=JobStatuses.error)
+                with _feedback_lock:
+                    JobDBModel.objects.update_log(
+                        instance=self.job_instance,
+                        context=context,
+                        flag=LoggerFlags.error,
+                        msg=LoggerMessageMap.error[context].value.format(error=str(ex)),
+                    )
+                    JobDBModel.objects.update_status(instance=self.job_instance, status=JobStatuses.error)
 
                 raise ex
 
@@ -1,8 +1,13 @@
-from typing import Optional
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+from typing import Optional, Callable, Dict, List, Any, Tuple
 
-from viva_vdm.core.blast import BlastCliWrapper
+from viva_vdm.core.blast.backends import BlastBackendFactory
+from viva_vdm.core.blast.cache import BlastResultCache
+from viva_vdm.core.cache import ResultCache
 from viva_vdm.core.iedb.mhci.constants import MhcISupertypes
 from viva_vdm.core.iedb.mhci.factory import MhcIPredictionFactory
+from viva_vdm.core.iedb.mhci.wrappers import MhcFlurry
 from viva_vdm.core.iedb.mhcii.constants import MhcIISupertypes
 from viva_vdm.core.iedb.mhcii.factory import MhcIIPredictionFactory
 from viva_vdm.core.models import (
@@ -11,8 +16,9 @@ from viva_vdm.core.models import (
     BlastDBModel,
     PrositeDBModel,
     MHCIPredictionMethods,
+    HCSResultsDBModel,
 )
-from viva_vdm.core.blast.models import BlastResults
+from viva_vdm.core.blast.models import DescriptionItem
 from viva_vdm.core.models.models import (
     MHCISupertypes,
     MHCIIPredictionMethods,
@@ -23,12 +29,23 @@ from viva_vdm.core.models.models import (
     LoggerMessages,
 )
 from viva_vdm.core.prosite import PrositeScan
+from viva_vdm.core.settings import AppConfig
 from viva_vdm.core.workflow.decorators import handle_feedback
 
+logger = logging.getLogger(__name__)
+
 
 class VitaWorkflow(object):
+    STAGES = (LoggerContexts.prosite, LoggerContexts.mhci, LoggerContexts.mhcii, LoggerContexts.blast)
+
+    BLAST_DATABASE = 'VNR'
+    MHCI_LENGTH = 9
+    MHCII_LENGTH = 12
+    PREDICTION_CUTOFF = 1.00
+
     def __init__(self, job_id: Optional[str] = None, job_instance: Optional[JobDBModel] = None):
         self.job_instance = job_instance or self._get_job_instance(job_id)
+        self.settings = AppConfig()
 
     @classmethod
     def _get_job_instance(cls, job_id: str):
@@ -44,84 +61,343 @@ class VitaWorkflow(object):
         )
 
     def _convey_job_end(self):
-        JobDBModel.objects.update_status(instance=self.job_instance, status=JobStatuses.completed)
+        # The log entry is written first, so that whoever sees the final status also finds it in the log.
         JobDBModel.objects.update_log(
             instance=self.job_instance,
             context=LoggerContexts.general,
             flag=LoggerFlags.info,
             msg=LoggerMessages.JOB_COMPLETED,
         )
+        JobDBModel.objects.update_status(instance=self.job_instance, status=JobStatuses.completed)
 
-    @handle_feedback(context=LoggerContexts.blast)
-    def _run_blast_for_hcs(self, hcs: HCSDBModel, taxonomy_id: int):
-        result = BlastCliWrapper(exclude_taxid=taxonomy_id, hcs=hcs.sequence, database='VNR').run_blast()  # type: BlastResults
+    def _convey_job_error(self):
+        JobDBModel.objects.update_log(
+            instance=self.job_instance,
+            context=LoggerContexts.general,
+            flag=LoggerFlags.error,
+            msg=LoggerMessages.JOB_ERROR,
+        )
+        JobDBModel.objects.update_status(instance=self.job_instance, status=JobStatuses.error)
+
+    @classmethod
+    def _save_stage_results(cls, hcs_list: List[HCSDBModel], context: LoggerContexts, results: List[Any]):
+        """
+        Persists the results of a stage for a batch of HCS with a single bulk write, and marks the stage as completed
+        for every HCS. Only the field of the stage is written, so stages of the same HCS can finish at the same time,
+        in any process.
+
+        :param hcs_list: The HCS that were analysed.
+        :param context: The stage that was run.
+        :param results: The values of the ``HCSResultsDBModel`` field of the stage, in the order of the HCS.
+
+        :type hcs_list: List[HCSDBModel]
+        :type context: LoggerContexts
+        :type results: List[Any]
+        """
+
+        HCSDBModel.objects.save_stage_results(context=context, results=list(zip(hcs_list, results)))
+
+        for hcs, result in zip(hcs_list, results):
+            setattr(hcs.results, context.value, result)
+
+            if context.value not in hcs.completed_stages:
+                hcs.completed_stages.append(context.value)
+
+    @classmethod
+    def _get_cached_or_run(
+        cls, hcs_list: List[HCSDBModel], cache: ResultCache, run: Callable[[List[str]], List[Any]]
+    ) -> List[Any]:
+        """
+        Returns the cached results of a stage for the HCS sequences, and runs the stage in one batch for the sequences
+        that are not cached yet, caching their results.
+
+        :param hcs_list: The HCS being analysed.
+        :param cache: The result cache of the stage, configured with the parameters the stage is run with.
+        :param run: Runs the stage for a list of sequences, and returns the values of the matching
+            ``HCSResultsDBModel`` field in the same order.
+
+        :type hcs_list: List[HCSDBModel]
+        :type cache: ResultCache
+        :type run: Callable[[List[str]], List[Any]]
+
+        :return: The values of the ``HCSResultsDBModel`` field of the stage, in the order of the HCS.
+        """
 
+        field = HCSResultsDBModel._fields[cache.stage.value]
+        results = dict()
+
+        for hcs in hcs_list:
+            cached = cache.get(hcs.sequence)
+
+            if cached is not None:
+                results[hcs.sequence] = field.to_python(cached)
+
+        missing_sequences = list(dict.fromkeys(hcs.sequence for hcs in hcs_list if hcs.sequence not in results))
+
+        if missing_sequences:
+            for sequence, result in zip(missing_sequences, run(missing_sequences)):
+                cache.set(sequence, field.to_mongo(result))
+                results[sequence] = result
+
+        return [results[hcs.sequence] for hcs in hcs_list]
+
+    @classmethod
+    def _get_blast_models(cls, descriptions: List[DescriptionItem]) -> List[BlastDBModel]:
         blast_model_entries = list()
-        for hit in result.BlastOutput2[0].report.results.search.hits:
-            for desc in hit.description:
-                sciname = desc.sciname
-                strain = None
+        for desc in descriptions:
+            sciname = desc.sciname
+            strain = None
 
-                if sciname and not sciname.isalnum():  # Strain name is included in scientific name
-                    parentheses_start = sciname.find("(") + 1
-                    parentheses_end = sciname.find(")", len(sciname) - 1)
+            if sciname and not sciname.isalnum():  # Strain name is included in scientific name
+                parentheses_start = sciname.find("(") + 1
+                parentheses_end = sciname.find(")", len(sciname) - 1)
 
-                    strain = sciname[parentheses_start:parentheses_end]
+                strain = sciname[parentheses_start:parentheses_end]
 
-                blast_model_entries.append(
-                    BlastDBModel(
-                        accession=desc.accession, species=sciname, strain=strain, taxid=desc.taxid, title=desc.title
-                    )
+            blast_model_entries.append(
+                BlastDBModel(
+                    accession=desc.accession, species=sciname, strain=strain, taxid=desc.taxid, title=desc.title
                 )
+            )
+
+        return blast_model_entries
+
+    @handle_feedback(context=LoggerContexts.blast)
+    def _run_blast(self, hcs_list: List[HCSDBModel], taxonomy_id: int):
+        cache = BlastResultCache(database=self.BLAST_DATABASE, exclude_taxid=taxonomy_id)
+
+        def run(sequences: List[str]) -> List[List[BlastDBModel]]:
+            blast_backend = BlastBackendFactory(database=self.BLAST_DATABASE, exclude_taxid=taxonomy_id)
+
+            return [
+                self._get_blast_models(descriptions)
+                for descriptions in blast_backend.blast_descriptions_many(sequences)
+            ]
 
-        hcs.results.blast = blast_model_entries
-        hcs.save()
+        self._save_stage_results(hcs_list, LoggerContexts.blast, self._get_cached_or_run(hcs_list, cache, run))
+
+        logger.debug('BLAST result cache: %s', BlastResultCache.get_stats())
 
     @handle_feedback(context=LoggerContexts.prosite)
-    def _run_prosite_for_hcs(self, hcs: HCSDBModel):
-        results = PrositeScan(output_xpsa=True, cutoff_value=-1, is_fasta=True, show_prof_start_end=True).scan(
-            hcs.sequence
+    def _run_prosite(self, hcs_list: List[HCSDBModel]):
+        scanner = PrositeScan(output_xpsa=True, cutoff_value=-1, is_fasta=True, show_prof_start_end=True)
+        cache = ResultCache(
+            stage=LoggerContexts.prosite,
+            parameters=dict(scanner.__dict__),
+            version=PrositeScan.get_database_release(),
         )
 
-        hcs.results.prosite = [
-            PrositeDBModel(
-                accession=result.accession, description=result.description, start=result.start, end=result.end
-            )
-            for result in results
-        ]
+        def run(sequences: List[str]) -> List[List[PrositeDBModel]]:
+            return [
+                [
+                    PrositeDBModel(
+                        accession=result.accession, description=result.description, start=result.start, end=result.end
+                    )
+                    for result in results
+                ]
+                for results in scanner.scan_many(sequences)
+            ]
 
-        hcs.save()
+        self._save_stage_results(hcs_list, LoggerContexts.prosite, self._get_cached_or_run(hcs_list, cache, run))
 
     @handle_feedback(context=LoggerContexts.mhci)
-    def _run_mhci_for_hcs(self, hcs: HCSDBModel, prediction_method: MHCIPredictionMethods):
-        supertype_results = dict()
-        for supertype in MhcISupertypes:
-            results = MhcIPredictionFactory(supertype=supertype, method=prediction_method.value).predict(hcs.sequence)
-            supertype_results[supertype.name] = [result.dict() for result in results]
+    def _run_mhci(self, hcs_list: List[HCSDBModel], prediction_method: MHCIPredictionMethods):
+        # MHCflurry scores peptides of several lengths, whatever the length it is asked for.
+        is_mhcflurry = prediction_method == MHCIPredictionMethods.MHCFLURRY
+
+        cache = ResultCache(
+            stage=LoggerContexts.mhci,
+            method=prediction_method.value,
+            parameters={
+                'length': MhcFlurry.PEPTIDE_LENGTHS if is_mhcflurry else self.MHCI_LENGTH,
+                'cutoff': self.PREDICTION_CUTOFF,
+                'supertypes': {supertype.name: supertype.value for supertype in MhcISupertypes},
+            },
+        )
+
+        def run(sequences: List[str]) -> List[MHCISupertypes]:
+            predictions = MhcIPredictionFactory.predict_supertype_records(
+                sequences,
+                method=prediction_method.value,
+                length=self.MHCI_LENGTH,
+                cutoff=self.PREDICTION_CUTOFF,
+            )
 
-        hcs.results.mhci = MHCISupertypes(**supertype_results)
-        hcs.save()
+            return [MHCISupertypes(**supertype_epitopes) for supertype_epitopes in predictions]
+
+        self._save_stage_results(hcs_list, LoggerContexts.mhci, self._get_cached_or_run(hcs_list, cache, run))
 
     @handle_feedback(context=LoggerContexts.mhcii)
-    def _run_mhcii_for_hcs(self, hcs: HCSDBModel, prediction_method: MHCIIPredictionMethods):
-        supertype_results = dict()
-        for supertype in MhcIISupertypes:
-            results = MhcIIPredictionFactory(supertype=supertype, method=prediction_method.value).predict(hcs.sequence)
-            supertype_results[supertype.name] = [result.dict() for result in results]
+    def _run_mhcii(self, hcs_list: List[HCSDBModel], prediction_method: MHCIIPredictionMethods):
+        cache = ResultCache(
+            stage=LoggerContexts.mhcii,
+            method=prediction_method.value,
+            parameters={
+                'length': self.MHCII_LENGTH,
+                'cutoff': self.PREDICTION_CUTOFF,
+                'supertypes': {supertype.name: supertype.value for supertype in MhcIISupertypes},
+            },
+        )
+
+        def run(sequences: List[str]) -> List[MHCIISupertypes]:
+            predictions = MhcIIPredictionFactory.predict_supertypes(
+                sequences,
+                method=prediction_method.value,
+                length=self.MHCII_LENGTH,
+                cutoff=self.PREDICTION_CUTOFF,
+            )
 
-        hcs.results.mhcii = MHCIISupertypes(**supertype_results)
-        hcs.save()
+            return [
+                MHCIISupertypes(
+                    **{
+                        supertype_name: [epitope.dict() for epitope in epitopes]
+                        for supertype_name, epitopes in supertype_epitopes.items()
+                    }
+                )
+                for supertype_epitopes in predictions
+            ]
+
+        self._save_stage_results(hcs_list, LoggerContexts.mhcii, self._get_cached_or_run(hcs_list, cache, run))
+
+    def _get_stage_runners(self) -> Dict[LoggerContexts, Callable[[List[HCSDBModel]], None]]:
+        """
+        Maps every analysis stage to a callable that runs it for a batch of HCS. The order of the mapping is the order
+        in which the stages are run sequentially.
+        """
+
+        return {
+            LoggerContexts.prosite: self._run_prosite,
+            LoggerContexts.mhci: lambda hcs_list: self._run_mhci(hcs_list, self.job_instance.mhci_prediction_method),
+            LoggerContexts.mhcii: lambda hcs_list: self._run_mhcii(hcs_list, self.job_instance.mhcii_prediction_method),
+            LoggerContexts.blast: lambda hcs_list: self._run_blast(hcs_list, self.job_instance.taxonomy_id),
+        }
+
+    def _get_stage_workers(self) -> Dict[LoggerContexts, int]:
+        return {
+            LoggerContexts.prosite: self.settings.workflow_prosite_workers,
+            LoggerContexts.mhci: self.settings.workflow_mhci_workers,
+            LoggerContexts.mhcii: self.settings.workflow_mhcii_workers,
+            LoggerContexts.blast: self.settings.workflow_blast_workers,
+        }
+
+    def _get_batches(self, items: List[Any]) -> List[List[Any]]:
+        batch_size = max(1, self.settings.workflow_batch_size)
+
+        return [items[index : index + batch_size] for index in range(0, len(items), batch_size)]  # noqa: E203
+
+    @classmethod
+    def _get_pending_hcs(cls, hcs_list: List[HCSDBModel], context: LoggerContexts) -> List[HCSDBModel]:
+        return [hcs for hcs in hcs_list if context.value not in hcs.completed_stages]
+
+    def _process_sequentially(self):
+        hcs_list = list(self.job_instance.hcs)
+
+        for context, runner in self._get_stage_runners().items():
+            for batch in self._get_batches(self._get_pending_hcs(hcs_list, context)):
+                runner(batch)
+
+    def _process_concurrently(self):
+        """
+        Every stage gets its own thread pool so that a slow stage (e.g. BLAST polling) does not hold up the others. The
+        stages themselves spend their time in subprocesses, native predictors, or waiting on the network, so threads
+        are enough to overlap them. The first failing stage cancels everything that has not started yet, and its
+        exception is re-raised once the running stages have finished.
+        """
+
+        hcs_list = list(self.job_instance.hcs)
+        stage_runners = self._get_stage_runners()
+        stage_workers = self._get_stage_workers()
+
+        executors = {
+            context: ThreadPoolExecutor(max_workers=max(1, stage_workers[context]), thread_name_prefix=context.value)
+            for context in stage_runners
+        }
+
+        try:
+            futures = [
+                executors[context].submit(runner, batch)
+                for context, runner in stage_runners.items()
+                for batch in self._get_batches(self._get_pending_hcs(hcs_list, context))
+            ]
+
+            _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+
+            for future in not_done:
+                future.cancel()
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+        for future in futures:
+            if not future.cancelled() and future.exception():
+                raise future.exception()
+
+    def get_pending_batches(self) -> List[Tuple[LoggerContexts, List[str]]]:
+        """
+        Returns the batches of HCS ids of this job that still have to go through each stage, without loading the
+        results of the HCS.
+        """
+
+        job = JobDBModel.objects(id=self.job_instance.id).only('hcs').as_pymongo().first()
+        completed_stages = {
+            hcs['_id']: set(hcs.get('completed_stages', []))
+            for hcs in HCSDBModel.objects(id__in=job['hcs']).only('completed_stages').as_pymongo()
+        }
+
+        return [
+            (context, batch)
+            for context in self.STAGES
+            for batch in self._get_batches(
+                [str(hcs_id) for hcs_id in job['hcs'] if context.value not in completed_stages.get(hcs_id, set())]
+            )
+        ]
+
+    def start(self) -> bool:
+        """
+        Marks the job as started.
+
+        :return: False if the job has already been completed, and there is nothing left to run.
+        """
 
-    def process(self):
         if self.job_instance.status == JobStatuses.completed:
-            return
+            return False
 
         self._convey_job_start()
 
-        for hcs in self.job_instance.hcs:
-            self._run_prosite_for_hcs(hcs)
-            self._run_mhci_for_hcs(hcs, self.job_instance.mhci_prediction_method)
-            self._run_mhcii_for_hcs(hcs, self.job_instance.mhcii_prediction_method)
-            self._run_blast_for_hcs(hcs, self.job_instance.taxonomy_id)
+        return True
 
+    def finish(self):
         self._convey_job_end()
+
+    def fail(self):
+        self._convey_job_error()
+
+    def run_stage(self, context: LoggerContexts, hcs_ids: List[str]):
+        """
+        Runs a single analysis stage for a batch of HCS of this job, skipping the HCS for which it has already been
+        completed. This is the unit of work of the distributed tasks.
+
+        :param context: One of the stages in ``VitaWorkflow.STAGES``.
+        :param hcs_ids: The ids of HCS that belong to this job.
+
+        :type context: LoggerContexts
+        :type hcs_ids: List[str]
+        """
+
+        pending_hcs = self._get_pending_hcs(list(HCSDBModel.objects(id__in=hcs_ids)), context)
+
+        if not pending_hcs:
+            return
+
+        self._get_stage_runners()[context](pending_hcs)
+
+    def process(self):
+        if not self.start():
+            return
+
+        if self.settings.workflow_concurrent:
+            self._process_concurrently()
+        else:
+            self._process_sequentially()
+
+        self.finish()
@@ -1 +1,2 @@
 from .enum_with_equality import EnumWithEquality
+from .request_coalescer import RequestCoalescer
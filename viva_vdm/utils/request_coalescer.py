@@ -0,0 +1,44 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class RequestCoalescer(object):
+    def __init__(self):
+        """
+        Coalesces concurrent calls with the same key into a single call: the first caller starts it, and every caller
+        that asks for the same key while it is in flight awaits the same result (or exception).
+
+        Example:
+            >>> from viva_vdm.utils import RequestCoalescer
+            >>> coalescer = RequestCoalescer()
+            >>> async def fetch(query: str) -> str:
+            ...     return await coalescer.run(query, lambda: get_from_upstream(query))
+        """
+
+        self._in_flight: Dict[Hashable, asyncio.Future] = dict()
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs ``fn``, unless a call with the same key is already in flight, and returns its result.
+
+        :param key: Calls with equal keys are coalesced.
+        :param fn: Starts the call, e.g. an upstream request.
+
+        :type key: Hashable
+        :type fn: Callable[[], Awaitable[T]]
+
+        :return: The result of the call.
+        """
+
+        future = self._in_flight.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # The call is shared, so a caller that goes away (e.g. a client that disconnects) must not cancel it.
+        return await asyncio.shield(future)
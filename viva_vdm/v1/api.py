@@ -1,9 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.inmemory import InMemoryBackend
 
+from viva_vdm.core.cache import CacheBackendFactory
+from viva_vdm.core.models.aio import close_database, get_database
+from viva_vdm.core.models.change_feed import job_change_feed
+from viva_vdm.core.taxonomy import get_taxonomy_index
 from viva_vdm.v1.endpoints import job_router, results_router, ncbi_router
+from viva_vdm.v1.endpoints.job import NEXT_CURSOR_HEADER
+from viva_vdm.v1.endpoints.helpers import NCBITaxonomyResponseHelper
 
 app = FastAPI(
     title="ViTA RESTful API",
@@ -21,9 +26,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # The cross-origin frontend can only read the headers listed here, e.g. to fetch the next page.
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
 @app.on_event("startup")
 async def startup():
-    FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")
+    FastAPICache.init(CacheBackendFactory(), prefix="fastapi-cache")
+    get_database()
+    job_change_feed.start()
+
+    if get_taxonomy_index().is_available():
+        get_taxonomy_index().open()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    job_change_feed.stop()
+    await NCBITaxonomyResponseHelper.close_session()
+    close_database()
@@ -1 +1,4 @@
 from .create_job_helper import CreateJobHelper
+from .job_events_helper import JobEventsHelper
+from .results_export_helper import ResultsExportHelper, ResultsExportError
+from .ncbi_taxonomy_response_helper import NCBITaxonomyResponseHelper
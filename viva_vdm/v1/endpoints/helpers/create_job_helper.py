@@ -18,7 +18,7 @@ class CreateJobHelper(object):
     @classmethod
     def _create_db_entry(cls, payload: CreateJobRequest) -> JobDBModel:
         payload_dict = payload.dict()
-        hcs_instances = [HCSDBModel(**hcs).save() for hcs in payload_dict.pop('hcs')]
+        hcs_instances = HCSDBModel.objects.insert_many([HCSDBModel(**hcs) for hcs in payload_dict.pop('hcs')])
 
         return JobDBModel(hcs=hcs_instances, **payload_dict).save()
 
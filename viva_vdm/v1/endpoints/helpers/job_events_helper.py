@@ -0,0 +1,124 @@
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import Request
+
+from viva_vdm.core.models import aio
+from viva_vdm.core.models.change_feed import job_change_feed
+from viva_vdm.core.models.models import JobStatuses
+from viva_vdm.core.settings import ResourceConfig
+from viva_vdm.v1.models.job import JobLogApiModel
+
+
+class JobEventsHelper(object):
+    FINAL_STATUSES = (JobStatuses.completed, JobStatuses.error)
+    LOG_PAGE_SIZE = 1000
+
+    def __init__(self, job_id: str, request: Request, last_event_id: Optional[int] = None):
+        settings = ResourceConfig()
+
+        self.job_id = job_id
+        self.request = request
+        self.log_cursor = last_event_id
+        self.status = None  # type: Optional[JobStatuses]
+        self.is_deleted = False
+
+        self.poll_interval = settings.job_events_poll_interval
+        self.heartbeat_interval = settings.job_events_heartbeat_interval
+
+    @classmethod
+    def _format_event(cls, event: str, data: str, event_id: Optional[int] = None) -> str:
+        lines = [f'event: {event}', f'data: {data}']
+
+        if event_id is not None:
+            lines.insert(0, f'id: {event_id}')
+
+        return '\n'.join(lines) + '\n\n'
+
+    async def _get_log_events(self) -> AsyncIterator[str]:
+        while not self.is_deleted:
+            page = await aio.get_job_log_page(self.job_id, cursor=self.log_cursor, limit=self.LOG_PAGE_SIZE)
+
+            # The job has been deleted while it was streamed.
+            if page is None:
+                self.is_deleted = True
+
+                return
+
+            entries, next_cursor = page
+
+            for entry in entries:
+                self.log_cursor = 0 if self.log_cursor is None else self.log_cursor + 1
+
+                yield self._format_event('log', JobLogApiModel(**entry).json(), self.log_cursor)
+
+            if next_cursor is None:
+                return
+
+    async def _get_new_events(self) -> AsyncIterator[str]:
+        status = await aio.get_job_status(self.job_id)
+
+        if status is None:
+            self.is_deleted = True
+
+            return
+
+        async for event in self._get_log_events():
+            yield event
+
+        # The last entry of the log may have been written after the final status (e.g. by an older worker), so the log
+        # is read once more before the stream ends.
+        if status in self.FINAL_STATUSES:
+            async for event in self._get_log_events():
+                yield event
+
+        if self.is_deleted:
+            return
+
+        # The status is sent after the log entries read with it, so the final status is always the last event.
+        if status != self.status:
+            self.status = status
+
+            yield self._format_event('status', json.dumps(status.value))
+
+    async def iter_events(self) -> AsyncIterator[str]:
+        """
+        Streams the status changes and new log entries of the job as Server-Sent Events, until the job completes,
+        fails, or is deleted, or the client disconnects. The id of every log event is the position of the entry in the
+        log, so a client that reconnects with a Last-Event-ID header only receives the entries it has not seen yet.
+
+        The job is read again whenever the job change feed reports a change, or every ``job_events_poll_interval``
+        seconds if change streams are not available.
+        """
+
+        loop = asyncio.get_running_loop()
+        changed = job_change_feed.subscribe(self.job_id)
+        last_sent = loop.time()
+
+        try:
+            while not await self.request.is_disconnected():
+                changed.clear()
+
+                async for event in self._get_new_events():
+                    last_sent = loop.time()
+
+                    yield event
+
+                if self.is_deleted or self.status in self.FINAL_STATUSES:
+                    return
+
+                # A comment line keeps proxies from closing the connection of a job that is idle for a while.
+                if loop.time() - last_sent >= self.heartbeat_interval:
+                    last_sent = loop.time()
+
+                    yield ': keep-alive\n\n'
+
+                timeout = self.heartbeat_interval if job_change_feed.available else self.poll_interval
+
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            job_change_feed.unsubscribe(self.job_id, changed)
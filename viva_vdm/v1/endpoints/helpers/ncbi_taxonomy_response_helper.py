@@ -1,25 +1,77 @@
+import ast
+import logging
 import re
-from typing import List
+from typing import List, Optional
 
-import requests
+import aiohttp
+from pydantic import ValidationError
 
+from viva_vdm.core.settings import ResourceConfig
+from viva_vdm.utils import RequestCoalescer
 from viva_vdm.v1.models import TaxonomyDBSuggestion
 
+logger = logging.getLogger(__name__)
+
 
 class NCBITaxonomyResponseHelper(object):
     REGEX_PATTERN_FOR_RESP = re.compile(r"new Array\((.*)\),")
     REGEX_PATTERN_FOR_TAXID = re.compile(r"(\d*$)")
     NCBI_TAXDB_ENDPOINT = 'https://blast.ncbi.nlm.nih.gov/portal/utils/autocomp.fcgi'
 
-    def __init__(self, query: str):
-        self.response = self._get_response(query)
+    _session: Optional[aiohttp.ClientSession] = None
+    _coalescer = RequestCoalescer()
+
+    def __init__(self, response: str):
+        self.response = response
+
+    @classmethod
+    def _get_session(cls) -> aiohttp.ClientSession:
+        # A single pool of connections to NCBI is shared by all the requests of the process.
+        if cls._session is None or cls._session.closed:
+            settings = ResourceConfig()
+
+            cls._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=settings.ncbi_max_connections),
+                timeout=aiohttp.ClientTimeout(total=settings.ncbi_timeout),
+                raise_for_status=True,
+            )
+
+        return cls._session
+
+    @classmethod
+    async def close_session(cls):
+        """
+        Closes the connections to NCBI, e.g. when the API shuts down.
+        """
+
+        if cls._session is not None:
+            await cls._session.close()
+            cls._session = None
+
+    @classmethod
+    async def _get_response(cls, query: str) -> str:
+        params = {'dict': 'blast_nr_prot_sg', 'q': query}
+
+        async with cls._get_session().get(cls.NCBI_TAXDB_ENDPOINT, params=params) as response:
+            return await response.text()
+
+    @classmethod
+    async def from_query(cls, query: str) -> 'NCBITaxonomyResponseHelper':
+        """
+        Queries the NCBI taxonomy autocomplete without blocking the event loop. Concurrent identical queries share a
+        single request to NCBI.
+
+        :param query: The start of the name of the taxon.
+        :type query: str
 
-    def _get_response(self, query: str) -> str:
-        req = requests.get(self.NCBI_TAXDB_ENDPOINT, {'dict': 'blast_nr_prot_sg', 'q': query})
+        :return: A helper for the response of NCBI.
 
-        req.raise_for_status()
+        Example:
+            >>> helper = await NCBITaxonomyResponseHelper.from_query('influenza')
+            >>> suggestions = helper.get_taxonomy_suggestions()
+        """
 
-        return req.text
+        return cls(await cls._coalescer.run(query, lambda: cls._get_response(query)))
 
     @classmethod
     def _sanitise_entry_data(cls, entry_data: str):
@@ -33,7 +85,8 @@ class NCBITaxonomyResponseHelper(object):
         if not matches:
             return list()
 
-        result_list = eval(f'[{matches[0]}]')
+        # The response is JavaScript, the suggestions are a list of string literals.
+        result_list = ast.literal_eval(f'[{matches[0]}]')
 
         taxonomy_suggestions = list()
         for item in result_list:
@@ -47,7 +100,8 @@ class NCBITaxonomyResponseHelper(object):
 
             try:
                 taxonomy_suggestions.append(TaxonomyDBSuggestion(label=sanitised_item, value=f'{tax_id}', taxid=tax_id))
-            except Exception:
-                print(tax_id)
+            except ValidationError as ex:
+                # NCBI sometimes suggests names without a taxonomy ID, they cannot be used as a filter.
+                logger.debug('Skipped NCBI taxonomy suggestion %r: %s', sanitised_item, ex)
 
         return taxonomy_suggestions
@@ -0,0 +1,257 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterator, List, Optional
+
+from bson import ObjectId
+
+from viva_vdm.core.models import aio
+from viva_vdm.v1.models.results import ExportCompressions, ExportFormats
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class ResultsExportError(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    A write-only file that keeps what is written to it until it is drained, so that writers which need a file (i.e.
+    the Parquet writer) can be streamed.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self._chunks = list()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b''.join(self._chunks), list()
+
+        return data
+
+
+class ResultsExportHelper(object):
+    BATCH_SIZE = 100
+
+    HCS_FIELDS = ['sequence', 'incidence', 'position', 'results']
+    ROW_FIELDS = [
+        'hcs_id',
+        'sequence',
+        'incidence',
+        'position',
+        'analysis',
+        'accession',
+        'description',
+        'start',
+        'end',
+        'species',
+        'strain',
+        'taxid',
+        'title',
+        'supertype',
+        'allele',
+        'epitope',
+        'percentile',
+    ]
+
+    MEDIA_TYPES = {
+        ExportFormats.ndjson: 'application/x-ndjson',
+        ExportFormats.csv: 'text/csv',
+        ExportFormats.parquet: 'application/vnd.apache.parquet',
+    }
+    COMPRESSED_MEDIA_TYPES = {ExportCompressions.gzip: 'application/gzip', ExportCompressions.zstd: 'application/zstd'}
+    COMPRESSION_EXTENSIONS = {ExportCompressions.gzip: '.gz', ExportCompressions.zstd: '.zst'}
+
+    def __init__(
+        self, job_id: str, hcs_ids: List[ObjectId], export_format: ExportFormats, compression: ExportCompressions
+    ):
+        """
+        Streams the results of every HCS of a job in a single file. The HCS are read through a single Mongo cursor,
+        and written straight from the raw documents, without being validated by the API models again.
+
+        NDJSON files have a line per HCS, with all its results. CSV and Parquet files have a row per result (e.g. per
+        Prosite hit, BLAST hit, or epitope), and a row without results for HCS that have none.
+
+        :param job_id: The ID of the job.
+        :param hcs_ids: The IDs of the HCS of the job.
+        :param export_format: The format of the file.
+        :param compression: How the file is compressed. Parquet files compress their columns instead.
+
+        :type job_id: str
+        :type hcs_ids: List[ObjectId]
+        :type export_format: ExportFormats
+        :type compression: ExportCompressions
+
+        Example:
+            >>> from viva_vdm.v1.endpoints.helpers import ResultsExportHelper
+            >>> helper = ResultsExportHelper(job_id, hcs_ids, ExportFormats.csv, ExportCompressions.gzip)
+            >>> response = StreamingResponse(helper.iter_file(), media_type=helper.media_type)
+        """
+
+        if export_format == ExportFormats.parquet and pyarrow is None:
+            raise ResultsExportError('Parquet exports need pyarrow to be installed')
+        if compression == ExportCompressions.zstd and zstandard is None:
+            raise ResultsExportError('zstd compressed exports need zstandard to be installed')
+
+        self.job_id = job_id
+        self.hcs_ids = hcs_ids
+        self.export_format = export_format
+        self.compression = compression
+
+    @property
+    def _is_compressed(self) -> bool:
+        return self.compression != ExportCompressions.none and self.export_format != ExportFormats.parquet
+
+    @property
+    def media_type(self) -> str:
+        if self._is_compressed:
+            return self.COMPRESSED_MEDIA_TYPES[self.compression]
+
+        return self.MEDIA_TYPES[self.export_format]
+
+    @property
+    def filename(self) -> str:
+        extension = self.COMPRESSION_EXTENSIONS[self.compression] if self._is_compressed else ''
+
+        return f'{self.job_id}.{self.export_format.value}{extension}'
+
+    @classmethod
+    def _iter_rows(cls, hcs: dict) -> Iterator[dict]:
+        hcs_row = dict(
+            hcs_id=str(hcs['_id']),
+            sequence=hcs.get('sequence'),
+            incidence=hcs.get('incidence'),
+            position=hcs.get('position'),
+        )
+        results = hcs.get('results') or dict()
+        has_results = False
+
+        for analysis in ('prosite', 'blast'):
+            for hit in results.get(analysis) or list():
+                has_results = True
+
+                yield {**hcs_row, **hit, 'analysis': analysis}
+
+        for analysis in ('mhci', 'mhcii'):
+            for supertype, epitopes in (results.get(analysis) or dict()).items():
+                for epitope in epitopes or list():
+                    has_results = True
+
+                    yield {
+                        **hcs_row,
+                        'analysis': analysis,
+                        'supertype': supertype,
+                        'allele': epitope.get('allele'),
+                        'epitope': epitope.get('sequence'),
+                        'percentile': epitope.get('percentile'),
+                    }
+
+        if not has_results:
+            yield hcs_row
+
+    def _encode_ndjson(self, batch: List[dict]) -> bytes:
+        lines = [json.dumps({**hcs, '_id': str(hcs['_id'])}, default=str) for hcs in batch]
+
+        return ('\n'.join(lines) + '\n').encode()
+
+    def _get_csv_encoder(self):
+        header_written = False
+
+        def encode(batch: List[dict]) -> bytes:
+            nonlocal header_written
+
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=self.ROW_FIELDS, extrasaction='ignore')
+
+            if not header_written:
+                writer.writeheader()
+                header_written = True
+
+            writer.writerows(row for hcs in batch for row in self._iter_rows(hcs))
+
+            return buffer.getvalue().encode()
+
+        return encode
+
+    def _get_parquet_schema(self) -> 'pyarrow.Schema':
+        types = dict(incidence=pyarrow.float64(), percentile=pyarrow.float64())
+        types.update({field: pyarrow.int64() for field in ('position', 'start', 'end', 'taxid')})
+
+        return pyarrow.schema([(field, types.get(field, pyarrow.string())) for field in self.ROW_FIELDS])
+
+    async def _iter_parquet(self, batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+        schema = self._get_parquet_schema()
+        sink = _ChunkSink()
+        compression = 'none' if self.compression == ExportCompressions.none else self.compression.value
+
+        # Every batch of HCS is written as a row group, and streamed as soon as it has been written.
+        with pyarrow.parquet.ParquetWriter(sink, schema, compression=compression) as writer:
+            async for batch in batches:
+                rows = [row for hcs in batch for row in self._iter_rows(hcs)]
+                writer.write_table(pyarrow.Table.from_pylist(rows, schema=schema))
+
+                yield sink.drain()
+
+        yield sink.drain()
+
+    def _get_compressor(self) -> Optional[object]:
+        if not self._is_compressed:
+            return None
+        elif self.compression == ExportCompressions.gzip:
+            return zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+        return zstandard.ZstdCompressor().compressobj()
+
+    async def iter_file(self) -> AsyncIterator[bytes]:
+        """
+        Streams the file, a batch of HCS at a time.
+
+        :return: The chunks of the file.
+        """
+
+        batches = aio.iter_hcs_batches(self.hcs_ids, fields=self.HCS_FIELDS, batch_size=self.BATCH_SIZE)
+
+        if self.export_format == ExportFormats.parquet:
+            async for chunk in self._iter_parquet(batches):
+                yield chunk
+
+            return
+
+        encode = self._encode_ndjson if self.export_format == ExportFormats.ndjson else self._get_csv_encoder()
+        compressor = self._get_compressor()
+
+        async for batch in batches:
+            chunk = compressor.compress(encode(batch)) if compressor else encode(batch)
+
+            # The compressors buffer small inputs, there is nothing to send until they have enough.
+            if chunk:
+                yield chunk
+
+        if compressor:
+            yield compressor.flush()
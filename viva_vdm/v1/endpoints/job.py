@@ -1,16 +1,32 @@
-from typing import List
+from datetime import datetime
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, status, HTTPException
-from mongoengine.errors import DoesNotExist
+from bson import ObjectId
+from fastapi import APIRouter, status, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from viva_vdm.core.models import JobDBModel
+from viva_vdm.core.models import LoggerContexts, LoggerFlags, aio
 from viva_vdm.core.models.models import JobStatuses
 from viva_vdm.v1.models import CreateJobRequest, JobHCSListModel
-from viva_vdm.v1.endpoints.helpers import CreateJobHelper
-from viva_vdm.v1.models.job import JobLogApiModel
+from viva_vdm.v1.endpoints.helpers import CreateJobHelper, JobEventsHelper
+from viva_vdm.v1.models.job import HCSFields, JobLogApiModel
 
 router = APIRouter(prefix='/job', tags=['job'])
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# The cursor of the next page is returned in this header, it is left out on the last page.
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def _get_page_size(cursor: Optional[Any], limit: Optional[int]) -> Optional[int]:
+    # Requests without a cursor or limit get every item, as they did before the endpoints were paginated.
+    if cursor is None and limit is None:
+        return None
+
+    return limit or DEFAULT_PAGE_SIZE
+
 
 @router.post('/create', status_code=status.HTTP_201_CREATED, response_description="Returns the auto-generated job id.")
 def create_job(payload: CreateJobRequest) -> str:
@@ -32,64 +48,136 @@ def create_job(payload: CreateJobRequest) -> str:
     response_description="Returns the current status of the job",
     response_model=JobStatuses,
 )
-def get_job_status(job_id: str) -> JobStatuses:
+async def get_job_status(job_id: str) -> JobStatuses:
     """
     Get the status of a job.
 
     If the provided job id is not found an HTTP 404 status is returned. A successful request will return an HTTP 200.
     """
 
-    try:
-        job_status = JobDBModel.objects.get(id=job_id).status
-        return job_status
-    except DoesNotExist:
+    job_status = await aio.get_job_status(job_id)
+
+    if job_status is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found, consider creating one.")
 
+    return job_status
+
 
 @router.get(
     '/{job_id}/hcs',
     status_code=status.HTTP_200_OK,
-    response_description="Returns a list of HCS for the job ID provide",
+    response_description="Returns a page of HCS for the job ID provide",
     response_model=List[JobHCSListModel],
+    response_model_exclude_unset=True,
 )
-def get_job_hcs(job_id: str) -> List[JobHCSListModel]:
+async def get_job_hcs(
+    job_id: str,
+    response: Response,
+    cursor: Optional[str] = Query(None, description=f'The {NEXT_CURSOR_HEADER} header of the previous page'),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description=f'The maximum number of HCS returned (default: {DEFAULT_PAGE_SIZE} with a cursor)',
+    ),
+    fields: Optional[List[HCSFields]] = Query(None, description='Only return these fields of every HCS'),
+) -> List[JobHCSListModel]:
     """
-    Get a list of HCS for the job ID
+    Get a page of HCS for the job ID, in the order they were submitted. The cursor of the next page is returned in the
+    X-Next-Cursor header. Without a cursor or limit every HCS is returned.
 
     If the provided job id is not found an HTTP 404 status is returned. A successful request will return an HTTP 200.
     """
 
-    try:
-        job = JobDBModel.objects.get(id=job_id)
-    except DoesNotExist:
+    if cursor and not ObjectId.is_valid(cursor):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+    page = await aio.get_job_hcs_page(
+        job_id,
+        cursor=cursor,
+        limit=_get_page_size(cursor, limit),
+        # The results of the HCS are never part of this response, so they are not read from Mongo either.
+        fields=[field.value for field in fields or HCSFields],
+    )
+
+    if page is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found, consider creating one.")
 
-    hcs_dicts = list()
-    for hcs in job.hcs:
-        hcs_dicts.append(
-            {
-                **hcs.to_mongo().to_dict(),
-                '_id': str(hcs.id),
-            }
-        )
+    hcs_dicts, next_cursor = page
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
-    return hcs_dicts
+    return [{**hcs, '_id': str(hcs['_id'])} for hcs in hcs_dicts]
 
 
 @router.get(
     '/{job_id}/log',
     status_code=status.HTTP_200_OK,
-    response_description="Returns a list of log entries for this job",
+    response_description="Returns a page of log entries for this job",
     response_model=List[JobLogApiModel],
 )
-def get_job_log(job_id: str) -> List[JobLogApiModel]:
+async def get_job_log(
+    job_id: str,
+    response: Response,
+    cursor: Optional[int] = Query(None, description=f'The {NEXT_CURSOR_HEADER} header of the previous page'),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description=f'The maximum number of entries returned (default: {DEFAULT_PAGE_SIZE} with a cursor)',
+    ),
+    context: Optional[List[LoggerContexts]] = Query(None, description='Only return entries of these contexts'),
+    flag: Optional[List[LoggerFlags]] = Query(None, description='Only return entries with these flags'),
+    since: Optional[datetime] = Query(None, description='Only return entries logged after this time'),
+) -> List[JobLogApiModel]:
+    """
+    Get a page of log entries for the job ID, oldest first. The cursor of the next page is returned in the
+    X-Next-Cursor header. Without a cursor or limit every entry is returned.
+
+    If the provided job id is not found an HTTP 404 status is returned. A successful request will return an HTTP 200.
+    """
+
+    page = await aio.get_job_log_page(
+        job_id, cursor=cursor, limit=_get_page_size(cursor, limit), contexts=context, flags=flag, since=since
+    )
+
+    if page is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found, consider creating one.")
+
+    entries, next_cursor = page
+
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+
+    return entries
+
+
+@router.get(
+    '/{job_id}/events',
+    status_code=status.HTTP_200_OK,
+    response_description="Streams the status changes and log entries of the job as Server-Sent Events",
+    response_class=StreamingResponse,
+)
+async def get_job_events(
+    job_id: str,
+    request: Request,
+    last_event_id: Optional[int] = Header(None, description='The id of the last log event received, to resume from'),
+) -> StreamingResponse:
     """
-    Get a list of HCS for the job ID
+    Stream the progress of a job as Server-Sent Events, instead of polling its status and log. Every new log entry is
+    sent as a "log" event, and every status change as a "status" event. The stream ends once the job has completed or
+    failed.
 
     If the provided job id is not found an HTTP 404 status is returned. A successful request will return an HTTP 200.
     """
 
-    try:
-        return [entry.to_mongo().to_dict() for entry in JobDBModel.objects.get(id=job_id).logs]
-    except DoesNotExist:
+    if await aio.get_job_status(job_id) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found, consider creating one.")
+
+    return StreamingResponse(
+        JobEventsHelper(job_id, request, last_event_id).iter_events(),
+        media_type='text/event-stream',
+        # Keeps reverse proxies (e.g. nginx) from buffering the stream.
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
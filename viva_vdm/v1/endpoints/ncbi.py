@@ -1,14 +1,31 @@
+import asyncio
 from typing import List
 
-import requests
+import aiohttp
 from fastapi import APIRouter, status, HTTPException
 from fastapi_cache.decorator import cache
 
+from viva_vdm.core.taxonomy import get_taxonomy_index
 from viva_vdm.v1.endpoints.helpers.ncbi_taxonomy_response_helper import NCBITaxonomyResponseHelper
 from viva_vdm.v1.models import TaxonomyDBSuggestion
 
 router = APIRouter(prefix='/ncbi', tags=['ncbi'])
 
+# The local index is rebuilt in place, its suggestions are never cached. Only the suggestions of NCBI are.
+NCBI_SUGGESTIONS_EXPIRE = 2592000
+
+
+@cache(expire=NCBI_SUGGESTIONS_EXPIRE, namespace='ncbi')
+async def get_ncbi_suggestions(query: str) -> List[TaxonomyDBSuggestion]:
+    try:
+        helper = await NCBITaxonomyResponseHelper.from_query(query)
+    except aiohttp.ClientResponseError as ex:
+        raise HTTPException(ex.status, f'Error querying NCBI Taxonomy database: {ex}')
+    except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+        raise HTTPException(status.HTTP_502_BAD_GATEWAY, f'Error querying NCBI Taxonomy database: {ex!r}')
+
+    return helper.get_taxonomy_suggestions()
+
 
 @router.get(
     '/taxdb/{query}',
@@ -16,15 +33,20 @@ router = APIRouter(prefix='/ncbi', tags=['ncbi'])
     response_description="Returns a list of taxonomy IDs and their respective names",
     response_model=List[TaxonomyDBSuggestion],
 )
-@cache(expire=2.592e6)
 async def get_suggested_taxonomy_ids(query: str) -> List[TaxonomyDBSuggestion]:
     """
-    Get a list of HCS for the job ID
+    Get a list of taxa whose names start with the query, from the local taxonomy index, or from NCBI if the index has
+    not been built.
 
-    If the provided job id is not found an HTTP 404 status is returned. A successful request will return an HTTP 200.
+    A successful request will return an HTTP 200.
     """
 
-    try:
-        return NCBITaxonomyResponseHelper(query).get_taxonomy_suggestions()
-    except requests.RequestException as ex:
-        raise HTTPException(ex.request.status_code, f'Error querying NCBI Taxonomy database: {ex}')
+    taxonomy_index = get_taxonomy_index()
+
+    if taxonomy_index.is_available():
+        return [
+            TaxonomyDBSuggestion(taxid=taxid, label=f'{name} (taxid:{taxid})', value=f'{taxid}')
+            for taxid, name in taxonomy_index.search(query)
+        ]
+
+    return await get_ncbi_suggestions(query)
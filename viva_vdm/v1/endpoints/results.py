@@ -1,8 +1,9 @@
-from fastapi import APIRouter, status, HTTPException
-from mongoengine import DoesNotExist
+from fastapi import APIRouter, status, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-from viva_vdm.core.models import HCSDBModel
-from viva_vdm.v1.models.results import HCSResultsApiModel
+from viva_vdm.core.models import aio
+from viva_vdm.v1.endpoints.helpers import ResultsExportError, ResultsExportHelper
+from viva_vdm.v1.models.results import ExportCompressions, ExportFormats, HCSResultsApiModel
 
 router = APIRouter(prefix='/results', tags=['results'])
 
@@ -13,14 +14,50 @@ router = APIRouter(prefix='/results', tags=['results'])
     response_description="Get all the results of a single HCS",
     response_model=HCSResultsApiModel,
 )
-def get_hcs_results(hcs_id: str) -> HCSResultsApiModel:
+async def get_hcs_results(hcs_id: str) -> HCSResultsApiModel:
     """
     Get all the results of a single HCS.
     """
 
-    try:
-        hcs_instance = HCSDBModel.objects.get(id=hcs_id)
-    except DoesNotExist:
+    results = await aio.get_hcs_results(hcs_id)
+
+    if results is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"HCS with id {hcs_id} does not exist")
 
-    return HCSResultsApiModel(**hcs_instance.results.to_mongo().to_dict())
+    return HCSResultsApiModel(**results)
+
+
+@router.get(
+    '/job/{job_id}',
+    status_code=status.HTTP_200_OK,
+    response_description="Streams the results of every HCS of the job as a single file",
+    response_class=StreamingResponse,
+)
+async def export_job_results(
+    job_id: str,
+    export_format: ExportFormats = Query(ExportFormats.ndjson, alias='format', description='The format of the file'),
+    compression: ExportCompressions = Query(ExportCompressions.gzip, description='How the file is compressed'),
+) -> StreamingResponse:
+    """
+    Download the results of every HCS of a job in a single request, as NDJSON (a line per HCS), or as CSV or Parquet (a
+    row per result). Parquet files compress their columns with the requested compression.
+
+    If the provided job id is not found an HTTP 404 status is returned. If the requested format or compression is not
+    available on the server an HTTP 501 status is returned. A successful request will return an HTTP 200.
+    """
+
+    hcs_ids = await aio.get_job_hcs_ids(job_id)
+
+    if hcs_ids is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job with id {job_id} does not exist")
+
+    try:
+        helper = ResultsExportHelper(job_id, hcs_ids, export_format, compression)
+    except ResultsExportError as ex:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(ex))
+
+    return StreamingResponse(
+        helper.iter_file(),
+        media_type=helper.media_type,
+        headers={'Content-Disposition': f'attachment; filename="{helper.filename}"'},
+    )
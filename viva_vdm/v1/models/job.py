@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import List
+from enum import Enum
+from typing import List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -18,8 +19,17 @@ class HCSApiModel(BaseModel):
     position: int = Field(..., title='The position at which this HCS was observed in the MSA')
 
 
-class JobHCSListModel(HCSApiModel):
+class JobHCSListModel(BaseModel):
     id: str = Field(..., title='Automatically generated ID for the HCS', alias='_id')
+    sequence: Optional[str] = Field(None, title='The sequence of the HCS')
+    incidence: Optional[float] = Field(None, title='The incidence of the HCS in the MSA')
+    position: Optional[int] = Field(None, title='The position at which this HCS was observed in the MSA')
+
+
+class HCSFields(Enum):
+    sequence: str = 'sequence'
+    incidence: str = 'incidence'
+    position: str = 'position'
 
 
 class JobLogApiModel(BaseModel):
@@ -27,7 +37,7 @@ class JobLogApiModel(BaseModel):
     flag: LoggerFlags = Field(..., title='The severity of the log entry')
     context: LoggerContexts = Field(..., title='The context of the log entry')
     timestamp: datetime = Field(..., title='When the log entry was created')
-    message: LoggerMessages = Field(..., title='The main content of the log entry')
+    message: Union[LoggerMessages, str] = Field(..., title='The main content of the log entry')
 
 
 class CreateJobRequest(BaseModel):
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import List
 
 from pydantic import BaseModel, Field
@@ -50,3 +51,15 @@ class HCSResultsApiModel(BaseModel):
     blast: List[BlastApiModel] = Field(None, title='NCBI Blast results')
     mhci: MHCISupertypes = Field(None, title='IEDB MHCI prediction results')
     mhcii: MHCIISupertypes = Field(None, title='IEDB MHCII prediction results')
+
+
+class ExportFormats(Enum):
+    ndjson: str = 'ndjson'
+    csv: str = 'csv'
+    parquet: str = 'parquet'
+
+
+class ExportCompressions(Enum):
+    none: str = 'none'
+    gzip: str = 'gzip'
+    zstd: str = 'zstd'